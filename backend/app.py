@@ -5,38 +5,72 @@ This file creates the Flask application instance and handles initialization
 """
 
 import os
+
+# Greenlet servers must patch the standard library before anything else is imported
+ASYNC_MODE = os.environ.setdefault('SOCKETIO_ASYNC_MODE', 'eventlet')
+if ASYNC_MODE == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+
+import logging
 import sys
-from pathlib import Path
-from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
 
 # Add the backend directory to Python path
-backend_dir = Path(__file__).parent
-sys.path.insert(0, str(backend_dir))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-# Load environment variables
-load_dotenv()
+# Load .env for local runs only - WSGI servers get their environment from the deployment
+if __name__ == '__main__':
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    # The development server is a single process, so it initializes the database itself
+    os.environ.setdefault('RUN_DB_INIT', '1')
+    os.environ.setdefault('ALVIN_SEED_DEMO', '1')
+    
+    # WSGI servers configure logging themselves; only the dev server sets it up here
+    logging.basicConfig(
+        level=os.environ.get('LOG_LEVEL', 'INFO'),
+        format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+    )
 
-# Import the application factory and database
-from app import create_app, db, initialize_database
+def run_database_init(app):
+    """Run initialize_database() once per host, serialized by a file lock"""
+    import fcntl
+    import tempfile
+    from app import initialize_database
+    
+    # The reloader and parallel dev servers would otherwise race on the schema setup
+    lock_path = os.path.join(tempfile.gettempdir(), 'alvin-db-init.lock')
+    with open(lock_path, 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            with app.app_context():
+                return initialize_database()
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
 
 def create_application():
     """Create and configure the Flask application"""
+    # Import the application factory lazily so importing this module stays cheap
+    from app import create_app
+    
     try:
         # Create Flask app
         app = create_app()
         
-        # Initialize database with app context
-        with app.app_context():
-            success = initialize_database()
-            if success:
-                print("✅ Application initialized successfully")
+        # Schema setup runs once (dev server or the Gunicorn master), never per worker
+        if os.environ.get('RUN_DB_INIT') == '1':
+            if run_database_init(app):
+                logger.info("Application initialized successfully")
             else:
-                print("⚠️ Application started but database initialization had issues")
+                logger.warning("Application started but database initialization had issues")
         
         return app
     
     except Exception as e:
-        print(f"❌ Failed to create application: {str(e)}")
+        logger.error("Failed to create application: %s", e)
         raise
 
 # Create the application instance
@@ -51,12 +85,15 @@ if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     host = os.environ.get('HOST', '0.0.0.0')
     
-    print(f"🚀 Starting ALVIN Backend on {host}:{port}")
-    print(f"🔧 Debug mode: {debug_mode}")
+    logger.info("Starting ALVIN Backend on %s:%s", host, port)
+    logger.info("Debug mode: %s", debug_mode)
+    logger.info("SocketIO async mode: %s", ASYNC_MODE)
     
-    application.run(
+    # Run through SocketIO so the websocket transport is served by the async server
+    from app import socketio
+    socketio.run(
+        application,
         host=host,
         port=port,
-        debug=debug_mode,
-        threaded=True
+        debug=debug_mode
     )
\ No newline at end of file
@@ -1,190 +1,844 @@
 # backend/app/__init__.py - FIXED CONFIGURATION
 
 import os
-import json
+import hashlib
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
 from datetime import datetime, timedelta
-from flask import Flask, jsonify, request
+from importlib import import_module
+import click
+from flask import Flask, Response, current_app, jsonify, request
+from flask.cli import with_appcontext
 from flask_sqlalchemy import SQLAlchemy
 from flask_socketio import SocketIO
-from flask_cors import CORS
-from flask_jwt_extended import JWTManager, jwt_required, create_access_token, get_jwt_identity
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask_jwt_extended import jwt_required, create_access_token, get_jwt_identity
+from sqlalchemy import insert, inspect, select
+from sqlalchemy.orm import configure_mappers
+from sqlalchemy.pool import QueuePool
+from werkzeug.http import parse_etags, quote_etag
+from app.json_provider import ORJSON_AVAILABLE, ORJSONProvider, json_bytes
+from app.services.jwt_cache import CachingJWTManager
+from app.services.passwords import hash_password
+from app.services.response_cache import ResponseCache
+from app.services.token_blocklist import TokenBlocklist
+from app.services.user_cache import UserCache
 
-# JWT Token Blacklist
-blacklisted_tokens = set()
+logger = logging.getLogger(__name__)
 
 # Initialize extensions
 db = SQLAlchemy()
 socketio = SocketIO()
-jwt = JWTManager()
+jwt = CachingJWTManager()
+token_blocklist = TokenBlocklist()
+response_cache = ResponseCache()
+user_cache = UserCache()
 
-def register_blueprints(app):
-    """Register all application blueprints with proper error handling"""
-    print("\n🔧 Registering blueprints...")
-    
-    # Blueprint configuration
-    blueprints = [
-        ('app.routes.auth', 'auth_bp', '/api/auth', 'Authentication'),
-        ('app.routes.projects', 'projects_bp', '/api/projects', 'Project Management'),  
-        ('app.routes.scenes', 'scenes_bp', '/api/scenes', 'Scene Management'),
-        ('app.routes.objects', 'objects_bp', '/api/objects', 'Story Objects'),
-        ('app.routes.analytics', 'analytics_bp', '/api/analytics', 'Analytics'),
-        ('app.routes.ai', 'ai_bp', '/api/ai', 'AI Operations'),
-        ('app.routes.collaboration', 'collaboration_bp', '/api/collaboration', 'Collaboration'),
-        ('app.routes.billing', 'billing_bp', '/api/billing', 'Billing')
-    ]
+# Models import db from this package, so they can only be loaded once it exists
+from app.models import User  # noqa: E402
+
+class StaticJSONResponse:
+    """JSON payload serialized once, served with an ETag so clients can revalidate with 304
     
-    registered = 0
-    failed = 0
+    Headers are prebuilt as well; each call only wraps them in a fresh Response, since
+    after_request hooks (CORS) add per-request headers and a shared object would leak them.
+    """
     
-    for module_name, blueprint_name, url_prefix, description in blueprints:
-        try:
-            print(f"   📦 Importing {module_name}...")
-            
-            # Import the module
-            import importlib
-            module = importlib.import_module(module_name)
-            
-            # Get the blueprint
-            if hasattr(module, blueprint_name):
-                blueprint = getattr(module, blueprint_name)
-                
-                # Register the blueprint with URL prefix
-                app.register_blueprint(blueprint, url_prefix=url_prefix)
-                
-                registered += 1
-                print(f"   ✅ {blueprint_name}: {description}")
-                print(f"      └─ Registered at {url_prefix}")
-                
-            else:
-                raise ImportError(f"Blueprint '{blueprint_name}' not found in {module_name}")
-                
-        except Exception as e:
-            failed += 1
-            print(f"   ❌ {blueprint_name}: {str(e)}")
-            app.logger.error(f"Blueprint registration failed: {module_name} - {e}")
+    def __init__(self, payload, max_age=5):
+        self.body = json_bytes(payload)
+        self.etag = hashlib.md5(self.body).hexdigest()
+        self.max_age = max_age
+        
+        cache_headers = [
+            ('ETag', quote_etag(self.etag)),
+            ('Cache-Control', f'public, max-age={max_age}')
+        ]
+        self.headers = [('Content-Type', 'application/json')] + cache_headers
+        self.not_modified_headers = cache_headers
+    
+    def __call__(self):
+        if request.if_none_match.contains(self.etag):
+            return Response(status=304, headers=self.not_modified_headers)
+        return Response(self.body, headers=self.headers)
+
+def collection_etag(*version_parts):
+    """ETag for a listing, built from its version markers and the request's query string"""
+    digest = hashlib.blake2b(digest_size=8)
+    for part in version_parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    digest.update(request.query_string)
+    return digest.hexdigest()
+
+def not_modified_response(etag):
+    """Bodiless 304 if the client already holds this ETag, otherwise None"""
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    return None
+
+# ============================================================================
+# JWT CALLBACKS
+# ============================================================================
+
+# Fixed error bodies are serialized once instead of on every rejected request
+EXPIRED_TOKEN_BODY = json_bytes({'message': 'Token has expired'})
+MISSING_TOKEN_BODY = json_bytes({'message': 'Authorization token is required'})
+
+def token_in_blocklist_callback(jwt_header, jwt_payload):
+    '''Check if a token has been blacklisted'''
+    return token_blocklist.is_revoked(jwt_payload['jti'])
+
+def encode_key_callback(identity):
+    '''HMAC key encoded once at startup instead of on every token issued'''
+    return current_app.config['JWT_SECRET_KEY_BYTES']
+
+def decode_key_callback(jwt_header, jwt_payload):
+    '''HMAC key encoded once at startup instead of on every token verified'''
+    return current_app.config['JWT_SECRET_KEY_BYTES']
+
+def expired_token_callback(jwt_header, jwt_payload):
+    logger.debug("JWT token expired - header: %s, payload: %s", jwt_header, jwt_payload)
+    return Response(EXPIRED_TOKEN_BODY, status=401, mimetype='application/json')
+
+def invalid_token_callback(error):
+    logger.debug("JWT invalid token error: %s", error)
+    body = json_bytes({'message': 'Invalid token', 'error_details': str(error)})
+    return Response(body, status=401, mimetype='application/json')
+
+def missing_token_callback(error):
+    logger.debug("JWT missing token error: %s", error)
+    return Response(MISSING_TOKEN_BODY, status=401, mimetype='application/json')
+
+def add_claims_to_jwt(identity):
+    user_id = int(identity)
+    # Only runs when a token is issued; users outside the database start at version 0
+    token_version = db.session.query(User.token_version).filter(User.id == user_id).scalar()
+    return {'user_id': user_id, 'tv': token_version or 0}
+
+def user_identity_lookup(user):
+    # Identities are user ids (int at login, str on refresh); tokens carry them as strings
+    return str(user)
+
+def user_lookup_callback(_jwt_header, jwt_data):
+    # The token version comes from the session's identity map or the short-lived
+    # version cache when possible; the returned user loads its row on first use
+    # user_id is an int claim set at issue time; only older tokens need the cast
+    user_id = jwt_data.get('user_id') or int(jwt_data['sub'])
+    user, token_version = user_cache.lookup(db.session, User, user_id)
+    
+    # A token from before the user's last revoke-all is rejected like an unknown user
+    if user is None or jwt_data.get('tv', 0) != token_version:
+        return None
+    return user
+
+# Environment-independent settings, built once at import instead of per create_app()
+STATIC_CONFIG = {
+    'JWT_ACCESS_TOKEN_EXPIRES': timedelta(hours=24),
+    'JWT_ALGORITHM': 'HS256',
+    # Tokens only ever arrive in the Authorization header and are signed with HS256
+    'JWT_DECODE_ALGORITHMS': ['HS256'],
+    'JWT_TOKEN_LOCATION': ['headers'],
+    'JWT_DECODE_LEEWAY': 0,
+    # Verified claims are reused for repeat requests with the same token (0 disables)
+    'JWT_DECODE_CACHE_TTL': 30,
+    'JWT_DECODE_CACHE_MAXSIZE': 10000,
+    # Serialized dashboard responses, keyed by a version stamp (0 disables)
+    'RESPONSE_CACHE_TTL': 60,
+    'RESPONSE_CACHE_MAXSIZE': 4096,
+    # User rows reused by the JWT user lookup for this many seconds (0 disables)
+    'USER_CACHE_TTL': 10,
+    'USER_CACHE_MAXSIZE': 10000,
+    # Most sub-requests accepted by POST /api/_batch
+    'BATCH_MAX_REQUESTS': 10,
+    # ✅ FIXED: Add TOKEN_LIMITS configuration (this was missing!)
+    'TOKEN_LIMITS': {
+        'free': 1000,
+        'pro': 10000,
+        'premium': 50000
+    },
+    'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+    # Listing page sizes read by the projects and scenes blueprints (same defaults as config.py)
+    'PROJECTS_PER_PAGE': 20,
+    'SCENES_PER_PAGE': 50
+}
+
+def get_engine_options(database_uri):
+    """Pick SQLAlchemy pool settings for the configured database
+    
+    Greenlet workers use the same QueuePool as threads: a checked-out connection
+    belongs to one greenlet until it is returned, and psycogreen keeps psycopg2
+    from blocking the hub while it waits.
+    """
+    if database_uri.startswith('sqlite') and ':memory:' in database_uri:
+        # In-memory SQLite keeps its single-connection pool
+        return {}
+    
+    return {
+        'poolclass': QueuePool,
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_pre_ping': True,
+        'pool_recycle': 1800
+    }
+
+def make_psycopg_green(async_mode):
+    """Let psycopg2 yield to the eventlet hub instead of blocking it on every query"""
+    if async_mode != 'eventlet':
+        return False
+    
+    try:
+        from psycogreen.eventlet import patch_psycopg
+    except ImportError:
+        logger.warning("psycogreen not installed - Postgres queries block the eventlet hub")
+        return False
+    
+    patch_psycopg()
+    return True
+
+# Returned to every Socket.IO client on connect; never mutated
+CONNECT_ACK = {'status': 'connected', 'message': 'Welcome to ALVIN!'}
+
+def handle_connect():
+    logger.debug("Client connected to ALVIN backend")
+    return CONNECT_ACK
+
+def handle_disconnect():
+    logger.debug("Client disconnected from ALVIN backend")
+
+# Registered once on the shared SocketIO object; init_app() attaches them to each app
+socketio.on_event('connect', handle_connect)
+socketio.on_event('disconnect', handle_disconnect)
+
+# ============================================================================
+# CORS
+# ============================================================================
+
+CORS_ORIGINS = frozenset({'http://localhost:3000', 'http://localhost:5173'})
+CORS_METHODS = ('GET', 'POST', 'PUT', 'DELETE', 'OPTIONS')
+CORS_HEADERS = ('Content-Type', 'Authorization')
+
+# Only Allow-Origin varies per preflight, so everything else is built once
+CORS_PREFLIGHT_HEADERS = {
+    'Access-Control-Allow-Credentials': 'true',
+    'Vary': 'Origin',
+    'Access-Control-Allow-Methods': ', '.join(CORS_METHODS),
+    'Access-Control-Allow-Headers': ', '.join(CORS_HEADERS),
+    'Access-Control-Max-Age': '86400'
+}
+
+def answer_cors_preflight():
+    """Short-circuit CORS preflights before routing and view dispatch"""
+    if request.method == 'OPTIONS':
+        origin = request.headers.get('Origin')
+        if origin in CORS_ORIGINS:
+            headers = dict(CORS_PREFLIGHT_HEADERS)
+            headers['Access-Control-Allow-Origin'] = origin
+            return Response(status=204, headers=headers)
+
+def add_cors_headers(response):
+    """Allow the frontend origins to read responses, with credentials"""
+    origin = request.headers.get('Origin')
+    if origin in CORS_ORIGINS and 'Access-Control-Allow-Origin' not in response.headers:
+        response.headers['Access-Control-Allow-Origin'] = origin
+        response.headers['Access-Control-Allow-Credentials'] = 'true'
+        # Add to Vary rather than replace it - cached and compressed responses set their own
+        response.vary.add('Origin')
+    return response
+
+# ============================================================================
+# LOGGING
+# ============================================================================
+
+log_listener = None
+log_listener_pid = None
+
+def configure_logging():
+    """Route the 'app' logger through a queue drained by a background thread
+    
+    Request handlers only enqueue records; formatting and the stderr write happen
+    on the listener thread. Flask's app.logger is this same logger, so it skips
+    installing its own stream handler. Safe to call more than once, and again after
+    a fork: the child inherits the queue handler but not the listener thread, so it
+    gets a queue and listener of its own.
+    """
+    global log_listener, log_listener_pid
+    if log_listener is not None and log_listener_pid == os.getpid():
+        return log_listener
+    
+    app_logger = logging.getLogger('app')
+    # Drop a handler inherited from the parent - nothing drains its queue here
+    for handler in list(app_logger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            app_logger.removeHandler(handler)
+    app_logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
+    
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    
+    # queue.Queue rather than SimpleQueue: its locks are green under eventlet, so a
+    # waiting listener yields to the hub instead of blocking it
+    log_queue = queue.Queue(-1)
+    app_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    app_logger.propagate = False
+    
+    log_listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    log_listener.start()
+    log_listener_pid = os.getpid()
+    atexit.register(log_listener.stop)
+    return log_listener
+
+# ============================================================================
+# DATABASE INITIALIZATION
+# ============================================================================
+
+DEMO_USER = {
+    'username': 'demo',
+    'email': 'demo@alvin.ai',
+    'full_name': 'Demo User',
+    'plan': 'free',
+    'tokens_limit': 1000
+}
+
+def create_demo_user(connection=None):
+    """Insert the demo account unless a user with its email already exists"""
+    if connection is None:
+        with db.engine.begin() as connection:
+            return create_demo_user(connection)
+
+    values = dict(DEMO_USER, password_hash=hash_password('demo123'))
+    dialect = connection.dialect.name
+
+    if dialect in ('postgresql', 'sqlite'):
+        # Single statement, safe when several processes seed at once
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        stmt = upsert(User).values(**values).on_conflict_do_nothing(index_elements=['email'])
+        return connection.execute(stmt).rowcount > 0
+
+    existing = connection.execute(select(User.id).where(User.email == DEMO_USER['email'])).first()
+    if existing is not None:
+        return False
+    connection.execute(insert(User).values(**values))
+    return True
+
+# Alembic revisions live next to the app package; resolved here so the CLI's cwd doesn't matter
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+def initialize_database(seed_demo=None):
+    """Bring the schema to the latest migration, optionally seeding the demo account (needs an app context)"""
+    from flask_migrate import Migrate, stamp, upgrade
+
+    if seed_demo is None:
+        seed_demo = os.environ.get('ALVIN_SEED_DEMO') == '1'
+
+    # Workers never register Alembic; only the one-off init path needs it
+    if 'migrate' not in current_app.extensions:
+        Migrate(current_app, db, directory=MIGRATIONS_DIR)
+
+    try:
+        inspector = inspect(db.engine)
+        if not inspector.has_table(User.__tablename__):
+            # Empty database: build it from the models and mark it current
+            db.create_all()
+            stamp(directory=MIGRATIONS_DIR)
+        else:
+            if not inspector.has_table('alembic_version'):
+                # Built by create_all() before migrations were tracked - that is the 001 schema
+                stamp(directory=MIGRATIONS_DIR, revision='001')
+            upgrade(directory=MIGRATIONS_DIR)
+
+        if seed_demo:
+            with db.engine.begin() as connection:
+                create_demo_user(connection)
+        return True
+    except Exception as e:
+        logger.exception("Database initialization failed: %s", e)
+        return False
+
+def warm_up_app(app):
+    """Run the lazy one-time setup now so the first request doesn't pay for it"""
+    # Resolve relationships between all mapped models
+    configure_mappers()
+    # Compile the URL matcher now that every blueprint is registered
+    app.url_map.update()
+    # Exercise the JSON provider once
+    app.json.dumps({})
+
+def warm_connection_pool(app):
+    """Open the pool's steady-state connections up front so first requests skip the handshake"""
+    pool_size = app.config['SQLALCHEMY_ENGINE_OPTIONS'].get('pool_size', 0)
+    if not pool_size:
+        return 0
+
+    with app.app_context():
+        # Hold them all at once - connecting and closing in turn would reuse a single one
+        connections = [db.engine.connect() for _ in range(pool_size)]
+        for connection in connections:
+            connection.close()
+    return pool_size
+
+@click.command('seed')
+@with_appcontext
+def seed_command():
+    """Create tables and the demo account"""
+    if not initialize_database(seed_demo=True):
+        raise click.ClickException('Database seeding failed')
+    click.echo('✅ Database seeded (demo@alvin.ai / demo123)')
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Apply pending migrations (and seed the demo account when ALVIN_SEED_DEMO=1)"""
+    if not initialize_database():
+        raise click.ClickException('Database initialization failed')
+    click.echo('✅ Database initialized')
+
+def cached_import(module_path, item_name):
+    """Return an attribute of a module, importing it only if it isn't fully loaded yet"""
+    # Repeated create_app() calls (reloader, tests) find every route module in
+    # sys.modules and skip the import machinery; a module still mid-import goes
+    # through import_module so this waits on its import lock
+    module = sys.modules.get(module_path)
+    if module is None or getattr(getattr(module, '__spec__', None), '_initializing', False):
+        module = import_module(module_path)
+    
+    try:
+        return getattr(module, item_name)
+    except AttributeError:
+        raise ImportError(f"'{item_name}' not found in {module_path}") from None
+
+def load_blueprint(app, module_name, blueprint_name, url_prefix, description):
+    """Import a blueprint module and register it, falling back to stub routes"""
+    try:
+        blueprint = cached_import(module_name, blueprint_name)
+        
+        # Register the blueprint with URL prefix
+        app.register_blueprint(blueprint, url_prefix=url_prefix)
+        
+        logger.info("Registered %s (%s) at %s", blueprint_name, description, url_prefix)
+        return True
             
-            # For development, create stub routes for missing blueprints
-            if 'ai' in module_name:
-                create_ai_stub_routes(app, url_prefix)
-            elif 'billing' in module_name and 'No module named' in str(e):
-                create_billing_stub_routes(app, url_prefix)
-    
-    print(f"\n📊 Blueprint Registration Summary:")
-    print(f"   ✅ Successfully registered: {registered}/8 blueprints")
-    print(f"   ❌ Failed registrations: {failed}/8 blueprints")
-    
-    if failed > 0:
-        print(f"   ⚠️  Some blueprints failed but stub routes created")
-    
-    print(f"✅ Blueprint registration complete!\n")
-    return {'registered': registered, 'failed': failed}
+    except Exception as e:
+        app.logger.error("Blueprint registration failed: %s - %s", module_name, e)
+        
+        # For development, create stub routes for missing blueprints
+        if 'ai' in module_name:
+            create_ai_stub_routes(app, url_prefix)
+        elif 'billing' in module_name and 'No module named' in str(e):
+            create_billing_stub_routes(app, url_prefix)
+        return False
+
+# (module, blueprint attribute, URL prefix, description)
+BLUEPRINTS = (
+    ('app.routes.auth', 'auth_bp', '/api/auth', 'Authentication'),
+    ('app.routes.projects', 'projects_bp', '/api/projects', 'Project Management'),
+    ('app.routes.scenes', 'scenes_bp', '/api/scenes', 'Scene Management'),
+    ('app.routes.objects', 'objects_bp', '/api/objects', 'Story Objects'),
+    ('app.routes.analytics', 'analytics_bp', '/api/analytics', 'Analytics'),
+    ('app.routes.ai', 'ai_bp', '/api/ai', 'AI Operations'),
+    ('app.routes.collaboration', 'collaboration_bp', '/api/collaboration', 'Collaboration'),
+    ('app.routes.billing', 'billing_bp', '/api/billing', 'Billing')
+)
+
+def register_blueprints(app):
+    """Import and register every route module, falling back to stubs where one fails
+    
+    Registration happens here, before the app serves anything: Flask's url_map is
+    not safe to modify while other threads or greenlets are matching against it.
+    """
+    registered = sum(
+        load_blueprint(app, module_name, blueprint_name, url_prefix, description)
+        for module_name, blueprint_name, url_prefix, description in BLUEPRINTS
+    )
+    logger.info("%d of %d blueprints registered", registered, len(BLUEPRINTS))
+    return {'registered': registered, 'failed': len(BLUEPRINTS) - registered}
+
+# Stand-ins served when the AI or billing blueprint fails to import. Their bodies
+# never change, so they are serialized once here like the other static routes.
+ai_status_stub_response = StaticJSONResponse({
+    'ai_available': False,
+    'simulation_mode': True,
+    'message': 'AI service temporarily unavailable',
+    'version': '1.0.0'
+})
+AI_UNAVAILABLE_BODY = json_bytes({
+    'error': 'AI service unavailable',
+    'message': 'AI analysis is temporarily disabled'
+})
+billing_plans_stub_response = StaticJSONResponse({
+    'plans': [
+        {
+            'id': 1,
+            'name': 'free',
+            'price': 0,
+            'tokens_limit': 1000,
+            'features': ['Basic writing tools', '1000 AI tokens']
+        },
+        {
+            'id': 2,
+            'name': 'pro',
+            'price': 9.99,
+            'tokens_limit': 10000,
+            'features': ['Advanced AI tools', '10000 AI tokens', 'Priority support']
+        }
+    ]
+})
+BILLING_SUBSCRIPTION_STUB_BODY = json_bytes({
+    'user_plan': 'free',
+    'tokens_used': 0,
+    'tokens_limit': 1000,
+    'tokens_remaining': 1000
+})
+
+def ai_status_stub():
+    return ai_status_stub_response()
+
+@jwt_required()
+def analyze_idea_stub():
+    return Response(AI_UNAVAILABLE_BODY, status=503, mimetype='application/json')
+
+def billing_plans_stub():
+    return billing_plans_stub_response()
+
+@jwt_required()
+def billing_subscription_stub():
+    return Response(BILLING_SUBSCRIPTION_STUB_BODY, mimetype='application/json')
 
 def create_ai_stub_routes(app, url_prefix):
     """Create stub AI routes if blueprint fails to load"""
-    @app.route(f'{url_prefix}/status', methods=['GET'])
-    def ai_status_stub():
-        return jsonify({
-            'ai_available': False,
-            'simulation_mode': True,
-            'message': 'AI service temporarily unavailable',
-            'version': '1.0.0'
-        }), 200
-    
-    @app.route(f'{url_prefix}/analyze-idea', methods=['POST'])
-    @jwt_required()
-    def analyze_idea_stub():
-        return jsonify({
-            'error': 'AI service unavailable',
-            'message': 'AI analysis is temporarily disabled'
-        }), 503
-    
-    print(f"   🔧 Created AI stub routes at {url_prefix}")
+    app.add_url_rule(f'{url_prefix}/status', view_func=ai_status_stub, methods=['GET'])
+    app.add_url_rule(f'{url_prefix}/analyze-idea', view_func=analyze_idea_stub, methods=['POST'])
+    logger.info("Created AI stub routes at %s", url_prefix)
 
 def create_billing_stub_routes(app, url_prefix):
     """Create stub billing routes if blueprint fails to load"""
-    @app.route(f'{url_prefix}/plans', methods=['GET'])
-    def billing_plans_stub():
+    app.add_url_rule(f'{url_prefix}/plans', view_func=billing_plans_stub, methods=['GET'])
+    app.add_url_rule(f'{url_prefix}/subscription', view_func=billing_subscription_stub, methods=['GET'])
+    logger.info("Created billing stub routes at %s", url_prefix)
+
+# ============================================================================
+# APP ROUTES
+# ============================================================================
+# Module-level views, registered on each app by create_app()
+
+# Shared by the static payloads below; each is serialized once at import
+DEMO_ACCOUNT = {'email': DEMO_USER['email'], 'password': 'demo123'}
+
+hello_response = StaticJSONResponse({
+    'message': '🎭 ALVIN Backend is WORKING!',
+    'status': 'running',
+    'version': '1.0.0',
+    'description': 'AI-powered creative writing assistant backend',
+    'endpoints': {
+        'health': '/health',
+        'api': '/api',
+        'demo': '/demo',
+        'auth': '/api/auth'
+    }
+})
+
+def hello():
+    return hello_response()
+
+health_response = StaticJSONResponse({
+    'status': 'healthy',
+    'service': 'ALVIN API',
+    'version': '1.0.0',
+    'message': 'Backend is running successfully!',
+    'database': 'Available',
+    'authentication': 'Ready',
+    'socketio': 'WebSocket ready'
+})
+
+def health_check():
+    return health_response()
+
+class HealthCheckMiddleware:
+    """Answer GET /health at the WSGI layer, before Flask builds a request context
+    
+    Orchestrator probes hit this every few seconds; the payload never changes, so
+    routing, hooks and teardown are skipped. Other requests pass straight through.
+    """
+    
+    def __init__(self, wsgi_app, path='/health'):
+        self.wsgi_app = wsgi_app
+        self.path = path
+        self.body = health_response.body
+        self.headers = health_response.headers + [('Content-Length', str(len(self.body)))]
+        self.not_modified_headers = health_response.not_modified_headers
+    
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO') == self.path and environ.get('REQUEST_METHOD') == 'GET':
+            # Same revalidation as StaticJSONResponse, without building a Request
+            if parse_etags(environ.get('HTTP_IF_NONE_MATCH')).contains(health_response.etag):
+                start_response('304 Not Modified', self.not_modified_headers)
+                return []
+            start_response('200 OK', self.headers)
+            return [self.body]
+        return self.wsgi_app(environ, start_response)
+
+api_info_response = StaticJSONResponse({
+    'service': 'ALVIN API',
+    'version': '1.0.0',
+    'status': 'Ready',
+    'authentication': 'JWT enabled',
+    'endpoints': {
+        'register': '/api/auth/register',
+        'login': '/api/auth/login',
+        'profile': '/api/auth/profile',
+        'projects': '/api/projects'
+    },
+    'demo_account': DEMO_ACCOUNT
+})
+
+def api_info():
+    return api_info_response()
+
+demo_info_response = StaticJSONResponse({
+    'message': 'ALVIN Demo Information',
+    'demo_account': DEMO_ACCOUNT,
+    'api_endpoints': {
+        'health': '/health',
+        'api_info': '/api',
+        'register': '/api/auth/register',
+        'login': '/api/auth/login',
+        'profile': '/api/auth/profile',
+        'verify_token': '/api/auth/verify',
+        'projects': '/api/projects',
+        'scenes': '/api/scenes',
+        'analytics': '/api/analytics/dashboard',
+        'billing': '/api/billing/plans'
+    },
+    'features': {
+        'authentication': 'JWT tokens',
+        'ai_simulation': 'Enabled',
+        'project_management': 'Full CRUD',
+        'scene_management': 'Full CRUD',
+        'analytics': 'User dashboard'
+    },
+    'status': 'ready'
+})
+
+def demo_info():
+    """Demo information endpoint"""
+    return demo_info_response()
+
+@jwt_required()
+def batch():
+    """Run several API calls in one HTTP request
+    
+    Sub-requests are dispatched in-process on this request's app context, so they
+    share one DB session and the already-decoded token.
+    """
+    app = current_app._get_current_object()
+    data = request.get_json(silent=True) or {}
+    sub_requests = data.get('requests')
+    
+    if not isinstance(sub_requests, list) or not sub_requests:
         return jsonify({
-            'plans': [
-                {
-                    'id': 1,
-                    'name': 'free',
-                    'price': 0,
-                    'tokens_limit': 1000,
-                    'features': ['Basic writing tools', '1000 AI tokens']
-                },
-                {
-                    'id': 2,
-                    'name': 'pro',
-                    'price': 9.99,
-                    'tokens_limit': 10000,
-                    'features': ['Advanced AI tools', '10000 AI tokens', 'Priority support']
-                }
-            ]
-        }), 200
+            'error': 'Validation error',
+            'message': 'Provide a non-empty "requests" list'
+        }), 400
     
-    @app.route(f'{url_prefix}/subscription', methods=['GET'])
-    @jwt_required()
-    def billing_subscription_stub():
+    max_requests = app.config['BATCH_MAX_REQUESTS']
+    if len(sub_requests) > max_requests:
         return jsonify({
-            'user_plan': 'free',
-            'tokens_used': 0,
-            'tokens_limit': 1000,
-            'tokens_remaining': 1000
+            'error': 'Validation error',
+            'message': f'A batch may contain at most {max_requests} requests'
+        }), 400
+    
+    headers = {'Authorization': request.headers.get('Authorization', '')}
+    responses = []
+    
+    for entry in sub_requests:
+        path = entry.get('path') if isinstance(entry, dict) else None
+        if not isinstance(path, str) or not path.startswith('/api/') or path.startswith('/api/_batch'):
+            responses.append({
+                'status': 400,
+                'body': {'error': 'Invalid path', 'message': 'Each request needs an /api/ path'}
+            })
+            continue
+        
+        try:
+            with app.test_request_context(
+                path,
+                method=str(entry.get('method', 'GET')).upper(),
+                json=entry.get('json'),
+                headers=headers
+            ):
+                sub_response = app.full_dispatch_request()
+            try:
+                # File responses stream from disk and can't be read back into a body
+                body = None if sub_response.direct_passthrough else sub_response.get_json(silent=True)
+            finally:
+                sub_response.close()
+            responses.append({
+                'status': sub_response.status_code,
+                'body': body
+            })
+        except Exception as e:
+            # The session is shared, so a failed sub-request must not poison the rest
+            db.session.rollback()
+            logger.exception("Batch sub-request to %s failed: %s", path, e)
+            responses.append({
+                'status': 500,
+                'body': {'error': 'Internal server error', 'message': 'An unexpected error occurred'}
+            })
+    
+    return jsonify({'responses': responses}), 200
+
+# Error bodies never vary, and scanners can make 404 a busy path
+NOT_FOUND_BODY = json_bytes({
+    'error': 'Not found',
+    'message': 'The requested resource was not found',
+    'available_endpoints': {
+        'home': '/',
+        'health': '/health',
+        'api_info': '/api',
+        'demo': '/demo',
+        'register': '/api/auth/register',
+        'login': '/api/auth/login'
+    }
+})
+INTERNAL_ERROR_BODY = json_bytes({
+    'error': 'Internal server error',
+    'message': 'An unexpected error occurred'
+})
+
+def not_found(error):
+    return Response(NOT_FOUND_BODY, status=404, mimetype='application/json')
+
+def internal_server_error(error):
+    return Response(INTERNAL_ERROR_BODY, status=500, mimetype='application/json')
+
+def database_status():
+    """Check database connection status"""
+    try:
+        User.query.first()
+        return jsonify({'database_connected': True}), 200
+    except Exception as e:
+        logger.warning("Database check error: %s", e)
+        return jsonify({'database_connected': False, 'error': str(e)}), 500
+
+def database_health():
+    """Read-only probe that the database is reachable"""
+    try:
+        db.session.execute(text('SELECT 1'))
+        return jsonify({'status': 'healthy', 'database_connected': True}), 200
+    except Exception as e:
+        return jsonify({'status': 'unhealthy', 'database_connected': False, 'error': str(e)}), 503
+
+redis_status_response = StaticJSONResponse({'redis_connected': True})
+
+def redis_status():
+    """Check Redis connection status (simulated)"""
+    return redis_status_response()
+
+def debug_headers():
+    """Debug endpoint to see all headers"""
+    return jsonify({
+        'method': request.method,
+        'headers': dict(request.headers),
+        'has_auth': 'Authorization' in request.headers,
+        'auth_header': request.headers.get('Authorization', 'Not provided')
+    }), 200
+
+def debug_decode_token():
+    """Debug endpoint to decode JWT token without validation"""
+    try:
+        data = request.get_json()
+        token = data.get('token', '') if data else ''
+        
+        if not token:
+            return jsonify({'error': 'No token provided'}), 400
+        
+        # Simple token info without full decoding
+        parts = token.split('.')
+        return jsonify({
+            'token_parts': len(parts),
+            'has_signature': len(parts) == 3,
+            'token_length': len(token),
+            'first_10_chars': token[:10] + '...',
+            'status': 'received'
         }), 200
-    
-    print(f"   🔧 Created billing stub routes at {url_prefix}")
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
 def create_app(config_name=None):
     """Create complete Flask application with authentication"""
 
+    # Before Flask() so app.logger finds the queue handler instead of adding its own
+    configure_logging()
     app = Flask(__name__)
     
+    # Serialize every jsonify() response with orjson when it is installed
+    if ORJSON_AVAILABLE:
+        app.json = ORJSONProvider(app)
+    
+    # Settings that never change between apps are merged in one dict update
+    app.config.update(STATIC_CONFIG)
+    
     # ✅ FIXED: Add missing configuration
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'alvin-dev-secret-key')
     app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt-dev-secret-key')
-    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
-    app.config['JWT_ALGORITHM'] = 'HS256'
+    app.config['JWT_SECRET_KEY_BYTES'] = app.config['JWT_SECRET_KEY'].encode('utf-8')
     
-    # ✅ FIXED: Add TOKEN_LIMITS configuration (this was missing!)
-    app.config['TOKEN_LIMITS'] = {
-        'free': 1000,
-        'pro': 10000,
-        'premium': 50000
-    }
+    app.config['DEBUG'] = os.environ.get('FLASK_ENV', 'development') != 'production'
+    
+    # Redis backs the JWT blocklist shared across workers (optional in development)
+    app.config['REDIS_URL'] = os.environ.get('REDIS_URL')
     
     # Database configuration
     database_url = os.environ.get('DATABASE_URL')
     if not database_url:
-        print("Warning: DATABASE_URL not set, using SQLite")
+        logger.warning("DATABASE_URL not set, using SQLite")
         app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///alvin.db'
     else:
         app.config['SQLALCHEMY_DATABASE_URI'] = database_url
     
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['DEBUG'] = True
+    app.config['SOCKETIO_ASYNC_MODE'] = os.environ.get('SOCKETIO_ASYNC_MODE', 'threading')
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = get_engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+    if app.config['SQLALCHEMY_DATABASE_URI'].startswith('postgresql'):
+        make_psycopg_green(app.config['SOCKETIO_ASYNC_MODE'])
     
     # Initialize extensions
     db.init_app(app)
+    
+    # Demo data is seeded by `flask seed`, not by request-serving workers
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(seed_command)
+    
+    # Alembic is only needed for `flask db` commands, never by request-serving workers
+    app.config['ENABLE_MIGRATIONS'] = os.environ.get('ENABLE_MIGRATIONS', 'false').lower() == 'true'
+    if app.config['ENABLE_MIGRATIONS']:
+        try:
+            from flask_migrate import Migrate
+            Migrate(app, db, directory=MIGRATIONS_DIR)
+        except ImportError:
+            logger.warning("flask-migrate not installed - `flask db` commands unavailable")
     jwt.init_app(app)
+    token_blocklist.init_app(app)
+    response_cache.init_app(app)
+    user_cache.init_app(app)
+    jwt.token_in_blocklist_loader(token_in_blocklist_callback)
+    jwt.encode_key_loader(encode_key_callback)
+    jwt.decode_key_loader(decode_key_callback)
 
-    @jwt.token_in_blocklist_loader
-    def check_if_token_revoked(jwt_header, jwt_payload):
-        '''Check if a token has been blacklisted'''
-        jti = jwt_payload['jti']
-        return jti in blacklisted_tokens
-
-    # CORS configuration
-    CORS(app, 
-         origins=['http://localhost:3000', 'http://localhost:5173'],
-         supports_credentials=True,
-         allow_headers=['Content-Type', 'Authorization'],
-         methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
+    app.before_request(answer_cors_preflight)
+    app.after_request(add_cors_headers)
 
+    # With Redis configured, emits are relayed through pub/sub so every worker sees them
     socketio.init_app(app, 
         cors_allowed_origins="*",
-        async_mode='threading',
+        async_mode=app.config['SOCKETIO_ASYNC_MODE'],
+        message_queue=app.config['REDIS_URL'],
         logger=False,
         engineio_logger=False)
     
@@ -192,213 +846,43 @@ def create_app(config_name=None):
     # BASIC APP ROUTES
     # ============================================================================
     
-    @app.route('/')
-    def hello():
-        return jsonify({
-            'message': '🎭 ALVIN Backend is WORKING!',
-            'status': 'running',
-            'version': '1.0.0',
-            'description': 'AI-powered creative writing assistant backend',
-            'endpoints': {
-                'health': '/health',
-                'api': '/api',
-                'demo': '/demo',
-                'auth': '/api/auth'
-            }
-        })
-    
-    @app.route('/health')
-    def health_check():
-        return jsonify({
-            'status': 'healthy',
-            'service': 'ALVIN API',
-            'version': '1.0.0',
-            'message': 'Backend is running successfully!',
-            'database': 'Available',
-            'authentication': 'Ready',
-            'socketio': 'WebSocket ready'
-        })
-    
-    @app.route('/api')
-    def api_info():
-        return jsonify({
-            'service': 'ALVIN API',
-            'version': '1.0.0',
-            'status': 'Ready',
-            'authentication': 'JWT enabled',
-            'endpoints': {
-                'register': '/api/auth/register',
-                'login': '/api/auth/login',
-                'profile': '/api/auth/profile',
-                'projects': '/api/projects'
-            },
-            'demo_account': {
-                'email': 'demo@alvin.ai',
-                'password': 'demo123'
-            }
-        })
-
-    @app.route('/demo')
-    def demo_info():
-        """Demo information endpoint"""
-        return jsonify({
-            'message': 'ALVIN Demo Information',
-            'demo_account': {
-                'email': 'demo@alvin.ai',
-                'password': 'demo123'
-            },
-            'api_endpoints': {
-                'health': '/health',
-                'api_info': '/api',
-                'register': '/api/auth/register',
-                'login': '/api/auth/login',
-                'profile': '/api/auth/profile',
-                'verify_token': '/api/auth/verify',
-                'projects': '/api/projects',
-                'scenes': '/api/scenes',
-                'analytics': '/api/analytics/dashboard',
-                'billing': '/api/billing/plans'
-            },
-            'features': {
-                'authentication': 'JWT tokens',
-                'ai_simulation': 'Enabled',
-                'project_management': 'Full CRUD',
-                'scene_management': 'Full CRUD',
-                'analytics': 'User dashboard'
-            },
-            'status': 'ready'
-        })
+    app.add_url_rule('/', view_func=hello)
+    app.add_url_rule('/health', view_func=health_check)
+    app.add_url_rule('/api', view_func=api_info)
+    app.add_url_rule('/demo', view_func=demo_info)
+    app.add_url_rule('/api/_batch', view_func=batch, methods=['POST'])
     
     # ============================================================================
     # ERROR HANDLERS
     # ============================================================================
     
-    @app.errorhandler(404)
-    def not_found(error):
-        return jsonify({
-            'error': 'Not found',
-            'message': 'The requested resource was not found',
-            'available_endpoints': {
-                'home': '/',
-                'health': '/health',
-                'api_info': '/api',
-                'demo': '/demo',
-                'register': '/api/auth/register',
-                'login': '/api/auth/login'
-            }
-        }), 404
-    
-    @app.errorhandler(500)
-    def internal_server_error(error):
-        return jsonify({
-            'error': 'Internal server error',
-            'message': 'An unexpected error occurred'
-        }), 500
+    app.register_error_handler(404, not_found)
+    app.register_error_handler(500, internal_server_error)
     
     # ============================================================================
     # SYSTEM DEBUG ROUTES (Add these to fix system endpoint failures)
     # ============================================================================
     
-    @app.route('/api/status/db', methods=['GET'])
-    def database_status():
-        """Check database connection status"""
-        try:
-            from app.models import User
-            User.query.first()
-            return jsonify({'database_connected': True}), 200
-        except Exception as e:
-            print(f"Database check error: {e}")
-            return jsonify({'database_connected': False, 'error': str(e)}), 500
-    
-    @app.route('/api/status/redis', methods=['GET'])
-    def redis_status():
-        """Check Redis connection status (simulated)"""
-        return jsonify({'redis_connected': True}), 200
-    
-    @app.route('/api/debug/headers', methods=['GET', 'POST'])
-    def debug_headers():
-        """Debug endpoint to see all headers"""
-        headers_dict = dict(request.headers)
-        print(f"🔍 Debug - All headers received: {headers_dict}")
-        
-        return jsonify({
-            'method': request.method,
-            'headers': headers_dict,
-            'has_auth': 'Authorization' in headers_dict,
-            'auth_header': headers_dict.get('Authorization', 'Not provided')
-        }), 200
+    app.add_url_rule('/api/status/db', view_func=database_status, methods=['GET'])
+    app.add_url_rule('/health/db', view_func=database_health, methods=['GET'])
+    app.add_url_rule('/api/status/redis', view_func=redis_status, methods=['GET'])
+    
+    # Request-inspection routes exist only in debug mode, not in production deployments
+    if app.debug:
+        app.add_url_rule('/api/debug/headers', view_func=debug_headers, methods=['GET', 'POST'])
+        app.add_url_rule('/api/debug/decode-token', view_func=debug_decode_token, methods=['POST'])
     
-    @app.route('/api/debug/decode-token', methods=['POST'])
-    def debug_decode_token():
-        """Debug endpoint to decode JWT token without validation"""
-        try:
-            data = request.get_json()
-            token = data.get('token', '') if data else ''
-            
-            if not token:
-                return jsonify({'error': 'No token provided'}), 400
-            
-            # Simple token info without full decoding
-            parts = token.split('.')
-            return jsonify({
-                'token_parts': len(parts),
-                'has_signature': len(parts) == 3,
-                'token_length': len(token),
-                'first_10_chars': token[:10] + '...',
-                'status': 'received'
-            }), 200
-            
-        except Exception as e:
-            return jsonify({'error': str(e)}), 500
-
     # ============================================================================
     # JWT ERROR HANDLERS
     # ============================================================================
     
-    @jwt.expired_token_loader
-    def expired_token_callback(jwt_header, jwt_payload):
-        print(f"🔍 JWT Token expired - Header: {jwt_header}, Payload: {jwt_payload}")
-        return jsonify({'message': 'Token has expired'}), 401
-    
-    @jwt.invalid_token_loader
-    def invalid_token_callback(error):
-        print(f"🔍 JWT Invalid token error: {error}")
-        print(f"🔍 JWT Error type: {type(error)}")
-        return jsonify({'message': 'Invalid token', 'error_details': str(error)}), 401
-    
-    @jwt.unauthorized_loader
-    def missing_token_callback(error):
-        print(f"🔍 JWT Missing token error: {error}")
-        return jsonify({'message': 'Authorization token is required'}), 401
-    
-    @jwt.token_in_blocklist_loader
-    def check_if_token_revoked(jwt_header, jwt_payload):
-        print(f"🔍 JWT Blocklist check - Header: {jwt_header}, Payload: {jwt_payload}")
-        return False  # For now, don't check blocklist
-    
-    @jwt.additional_claims_loader
-    def add_claims_to_jwt(identity):
-        print(f"🔍 JWT Adding claims for identity: {identity} (type: {type(identity)})")
-        # identity is now a string, convert to int to get user_id
-        user_id = int(identity)
-        return {'user_id': user_id}
-    
-    @jwt.user_identity_loader
-    def user_identity_lookup(user):
-        print(f"🔍 JWT Identity lookup for user: {user} (type: {type(user)})")
-        # If user is an integer (user ID), convert to string
-        if isinstance(user, int):
-            return str(user)
-        # If user is already a string, return as-is
-        return user
-    
-    @jwt.user_lookup_loader
-    def user_lookup_callback(_jwt_header, jwt_data):
-        identity = jwt_data["sub"]  # This will be a string now
-        user_id = int(identity)  # Convert to int for database lookup
-        print(f"🔍 JWT User lookup for identity: {identity} (converted to int: {user_id})")
-        from app.models import User
-        return User.query.filter_by(id=user_id).one_or_none()
+    jwt.expired_token_loader(expired_token_callback)
+    jwt.invalid_token_loader(invalid_token_callback)
+    jwt.unauthorized_loader(missing_token_callback)
+    
+    jwt.additional_claims_loader(add_claims_to_jwt)
+    jwt.user_identity_loader(user_identity_lookup)
+    jwt.user_lookup_loader(user_lookup_callback)
     
     # ============================================================================
     # REGISTER BLUEPRINTS (With error handling and stubs)
@@ -407,27 +891,11 @@ def create_app(config_name=None):
     # Register all blueprints with fallback stubs
     register_blueprints(app)
     
-    # ============================================================================
-    # SOCKET.IO EVENTS
-    # ============================================================================
+    # Outermost, so health probes skip Socket.IO's middleware as well as Flask
+    app.wsgi_app = HealthCheckMiddleware(app.wsgi_app)
+    
+    warm_up_app(app)
     
-    @socketio.on('connect')
-    def handle_connect():
-        print('🔌 Client connected to ALVIN backend')
-        return {'status': 'connected', 'message': 'Welcome to ALVIN!'}
-    
-    @socketio.on('disconnect')
-    def handle_disconnect():
-        print('🔌 Client disconnected from ALVIN backend')
-    
-    print("=" * 60)
-    print("🎭 ALVIN Backend Ready with Complete API!")
-    print("🌐 API available at: http://localhost:5000")
-    print("🔐 Auth endpoints: /api/auth/register, /api/auth/login")
-    print("📝 Projects: /api/projects (GET, POST, PUT)")
-    print("🎬 Scenes: /api/scenes (GET, POST, PUT, DELETE)")
-    print("📊 Analytics: /api/analytics/dashboard")
-    print("🎪 Demo: demo@alvin.ai / demo123")
-    print("=" * 60)
+    logger.info("ALVIN Backend ready - auth, projects, scenes and analytics under /api")
     
     return app
\ No newline at end of file
@@ -0,0 +1,54 @@
+# app/json_provider.py - ALVIN JSON Serialization
+"""
+orjson-backed JSON provider for Flask, with a stdlib fallback when orjson is missing
+"""
+import json
+import logging
+from flask.json.provider import DefaultJSONProvider
+
+logger = logging.getLogger(__name__)
+
+# Graceful dependency import - keep Flask's stdlib provider if orjson is missing
+ORJSON_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    logger.info("orjson not available - using stdlib json")
+
+
+def json_bytes(payload):
+    """Serialize a payload straight to UTF-8 bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload).encode('utf-8')
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes with orjson
+
+    Datetimes are passed through to Flask's default hook so responses keep the
+    same HTTP-date format jsonify has always produced.
+    """
+
+    option = None
+
+    def __init__(self, app):
+        super().__init__(app)
+        if ORJSON_AVAILABLE:
+            self.option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # orjson already produces bytes, so skip the str round trip
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option),
+            mimetype=self.mimetype
+        )
@@ -4,8 +4,9 @@ Database models with corrected table names that match migrations
 """
 import uuid
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import bindparam, select
 from app import db
+from app.services.passwords import hash_password, password_needs_rehash, reject_password, verify_password
 
 class User(db.Model):
     """User model for authentication and profile management"""
@@ -33,16 +34,38 @@ class User(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_login = db.Column(db.DateTime)
     
-    # Relationships - FIXED foreign key references
-    projects = db.relationship('Project', backref='user', lazy='dynamic', cascade='all, delete-orphan')
+    # Stamped into every JWT; bumping it revokes all tokens issued before
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    # Relationships - FIXED foreign key references. Each side is declared with
+    # back_populates so it can pick its own loading strategy.
+    projects = db.relationship('Project', back_populates='user', lazy='select', cascade='all, delete-orphan')
+    # Append-only usage history can grow without bound, so it is only ever queried
+    token_usage = db.relationship('TokenUsageLog', back_populates='user', lazy='dynamic')
+    subscription = db.relationship('UserSubscription', back_populates='user')
+    comments = db.relationship('Comment', foreign_keys='Comment.user_id', back_populates='author')
+    resolved_comments = db.relationship('Comment', foreign_keys='Comment.resolved_by', back_populates='resolver')
+    collaborations = db.relationship('ProjectCollaborator', foreign_keys='ProjectCollaborator.user_id',
+                                     back_populates='user')
+    sent_invitations = db.relationship('ProjectCollaborator', foreign_keys='ProjectCollaborator.invited_by',
+                                       back_populates='inviter')
     
     def set_password(self, password):
         """Set password hash"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        """Check password against hash"""
-        return check_password_hash(self.password_hash, password)
+        """Check password against hash, upgrading an outdated hash on success
+        
+        The upgraded hash is only stored once the caller commits.
+        """
+        if not self.password_hash:
+            return reject_password(password)
+        if not verify_password(self.password_hash, password):
+            return False
+        if password_needs_rehash(self.password_hash):
+            self.set_password(password)
+        return True
     
     def get_remaining_tokens(self):
         """Get remaining token count"""
@@ -72,6 +95,9 @@ class User(db.Model):
             'last_login': self.last_login.isoformat() if self.last_login else None
         }
 
+# Hot user lookup as a prebuilt select() statement, so repeat calls hit the compiled cache
+USER_BY_EMAIL = select(User).where(User.email == bindparam('email'))
+
 class Project(db.Model):
     """Project model for story projects"""
     __tablename__ = 'project'  # FIXED: Changed from 'projects' to 'project'
@@ -110,11 +136,23 @@ class Project(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships - FIXED foreign key references
-    scenes = db.relationship('Scene', backref='project', lazy='dynamic', cascade='all, delete-orphan')
-    story_objects = db.relationship('StoryObject', backref='project', lazy='dynamic', cascade='all, delete-orphan')
-    
-    def to_dict(self):
-        """Convert to dictionary for JSON serialization"""
+    user = db.relationship('User', back_populates='projects')
+    scenes = db.relationship('Scene', back_populates='project', lazy='dynamic', cascade='all, delete-orphan')
+    story_objects = db.relationship('StoryObject', back_populates='project', lazy='dynamic', cascade='all, delete-orphan')
+    token_usage = db.relationship('TokenUsageLog', back_populates='project', lazy='dynamic')
+    comments = db.relationship('Comment', back_populates='project')
+    collaborators = db.relationship('ProjectCollaborator', back_populates='project')
+    
+    def to_dict(self, scene_count=None, object_count=None):
+        """Convert to dictionary for JSON serialization
+        
+        Pass precomputed counts when serializing many projects to avoid two COUNT queries each.
+        """
+        if scene_count is None:
+            scene_count = self.scenes.count()
+        if object_count is None:
+            object_count = self.story_objects.count()
+        
         return {
             'id': self.id,
             'title': self.title,
@@ -133,10 +171,18 @@ class Project(db.Model):
             'user_id': self.user_id,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'scene_count': self.scenes.count(),
-            'object_count': self.story_objects.count()
+            'scene_count': scene_count,
+            'object_count': object_count
         }
 
+# Columns serialized by Project.to_dict(), for listings that skip ORM hydration
+PROJECT_LIST_COLS = (
+    Project.id, Project.title, Project.description, Project.genre, Project.target_audience,
+    Project.expected_length, Project.status, Project.current_phase, Project.current_word_count,
+    Project.target_word_count, Project.tone, Project.estimated_scope, Project.marketability,
+    Project.original_idea, Project.user_id, Project.created_at, Project.updated_at
+)
+
 class Scene(db.Model):
     """Scene model for individual scenes within projects"""
     __tablename__ = 'scene'  # FIXED: Changed from 'scenes' to 'scene'
@@ -169,6 +215,11 @@ class Scene(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Relationships
+    project = db.relationship('Project', back_populates='scenes')
+    token_usage = db.relationship('TokenUsageLog', back_populates='scene', lazy='dynamic')
+    comments = db.relationship('Comment', back_populates='scene')
+    
     def to_dict(self):
         """Convert to dictionary for JSON serialization"""
         return {
@@ -191,6 +242,14 @@ class Scene(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+# Columns serialized by Scene.to_dict(), for listings that skip ORM hydration
+SCENE_LIST_COLS = (
+    Scene.id, Scene.title, Scene.description, Scene.content, Scene.scene_type,
+    Scene.emotional_intensity, Scene.order_index, Scene.status, Scene.location, Scene.conflict,
+    Scene.hook, Scene.character_focus, Scene.word_count, Scene.dialog_count, Scene.project_id,
+    Scene.created_at, Scene.updated_at
+)
+
 class StoryObject(db.Model):
     """Story objects like characters, locations, items"""
     __tablename__ = 'story_object'  # FIXED: Changed from 'story_objects' to 'story_object'
@@ -220,6 +279,9 @@ class StoryObject(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Relationships
+    project = db.relationship('Project', back_populates='story_objects')
+    
     def to_dict(self):
         """Convert to dictionary for JSON serialization"""
         return {
@@ -289,9 +351,9 @@ class TokenUsageLog(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships - FIXED foreign key references
-    user = db.relationship('User', backref='token_usage')
-    project = db.relationship('Project', backref='token_usage')
-    scene = db.relationship('Scene', backref='token_usage')
+    user = db.relationship('User', back_populates='token_usage')
+    project = db.relationship('Project', back_populates='token_usage')
+    scene = db.relationship('Scene', back_populates='token_usage')
     
     def to_dict(self):
         """Convert to dictionary for JSON serialization"""
@@ -328,6 +390,9 @@ class BillingPlan(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Relationships
+    subscriptions = db.relationship('UserSubscription', back_populates='plan')
+    
     def to_dict(self):
         """Convert to dictionary for JSON serialization"""
         return {
@@ -369,8 +434,8 @@ class UserSubscription(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships - FIXED foreign key references
-    user = db.relationship('User', backref='subscription')
-    plan = db.relationship('BillingPlan', backref='subscriptions')
+    user = db.relationship('User', back_populates='subscription')
+    plan = db.relationship('BillingPlan', back_populates='subscriptions')
     
     def to_dict(self):
         """Convert to dictionary for JSON serialization"""
@@ -419,11 +484,12 @@ class Comment(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships - FIXED to match corrected table names
-    project = db.relationship('Project', backref='comments')
-    scene = db.relationship('Scene', backref='comments')
-    author = db.relationship('User', foreign_keys=[user_id], backref='comments')
-    resolver = db.relationship('User', foreign_keys=[resolved_by], backref='resolved_comments')
-    replies = db.relationship('Comment', backref=db.backref('parent', remote_side=[id]))
+    project = db.relationship('Project', back_populates='comments')
+    scene = db.relationship('Scene', back_populates='comments')
+    author = db.relationship('User', foreign_keys=[user_id], back_populates='comments')
+    resolver = db.relationship('User', foreign_keys=[resolved_by], back_populates='resolved_comments')
+    replies = db.relationship('Comment', back_populates='parent')
+    parent = db.relationship('Comment', back_populates='replies', remote_side=[id])
     
     def to_dict(self):
         """Convert to dictionary for JSON serialization"""
@@ -472,9 +538,9 @@ class ProjectCollaborator(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships - FIXED to match corrected table names
-    project = db.relationship('Project', backref='collaborators')
-    user = db.relationship('User', foreign_keys=[user_id], backref='collaborations')
-    inviter = db.relationship('User', foreign_keys=[invited_by], backref='sent_invitations')
+    project = db.relationship('Project', back_populates='collaborators')
+    user = db.relationship('User', foreign_keys=[user_id], back_populates='collaborations')
+    inviter = db.relationship('User', foreign_keys=[invited_by], back_populates='sent_invitations')
     
     # Unique constraint
     __table_args__ = (db.UniqueConstraint('project_id', 'user_id', name='unique_project_user'),)
@@ -505,6 +571,51 @@ class ProjectCollaborator(db.Model):
             } if self.inviter else None
         }
 
+def count_by_project(model, project_ids):
+    """Count rows of a project-owned model for many projects in one grouped query"""
+    if not project_ids:
+        return {}
+    
+    rows = db.session.query(model.project_id, db.func.count(model.id)) \
+        .filter(model.project_id.in_(project_ids)) \
+        .group_by(model.project_id) \
+        .all()
+    return dict(rows)
+
+def revoke_user_tokens(user_id):
+    """Invalidate every token issued to a user so far (caller commits)"""
+    db.session.query(User).filter(User.id == user_id).update(
+        {User.token_version: User.token_version + 1},
+        synchronize_session=False
+    )
+
+def row_to_dict(row, **extra):
+    """Serialize a column-only result row the same way the model's to_dict() would"""
+    data = dict(row._mapping)
+    for key in ('created_at', 'updated_at'):
+        if data.get(key) is not None:
+            data[key] = data[key].isoformat()
+    data.update(extra)
+    return data
+
+def project_dicts(projects):
+    """Serialize projects (models or PROJECT_LIST_COLS rows) with their scene and object counts"""
+    project_ids = [project.id for project in projects]
+    scene_counts = count_by_project(Scene, project_ids)
+    object_counts = count_by_project(StoryObject, project_ids)
+    
+    data = []
+    for project in projects:
+        counts = {
+            'scene_count': scene_counts.get(project.id, 0),
+            'object_count': object_counts.get(project.id, 0)
+        }
+        if isinstance(project, Project):
+            data.append(project.to_dict(**counts))
+        else:
+            data.append(row_to_dict(project, **counts))
+    return data
+
 # UPDATE: Add these to the __all__ export list at the bottom of models.py
 __all__ = [
     'User',
@@ -3,6 +3,8 @@ from datetime import datetime, timedelta
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import Schema, fields, ValidationError
+from app import db, StaticJSONResponse
+from app.models import Project, Scene, StoryObject
 import json
 import uuid
 
@@ -26,28 +28,60 @@ class AnalyzeSceneSchema(Schema):
     ])
     focus_areas = fields.List(fields.Str(), missing=[])
 
+analyze_idea_schema = AnalyzeIdeaSchema()
+create_project_from_idea_schema = CreateProjectFromIdeaSchema()
+analyze_scene_schema = AnalyzeSceneSchema()
+
+# Simulation content is fixed, so it is built once rather than on every call
+SCENE_SUGGESTION_TEMPLATES = (
+    (1, 'Development', 'Advance the plot with character interaction', 'development', 600, 'high'),
+    (2, 'Conflict', 'Introduce a new challenge or obstacle', 'conflict', 750, 'medium'),
+)
+
+CRITIC_ANALYSIS = {
+    'structure': {
+        'score': 0.8,
+        'feedback': 'Scene has good structure with clear beginning and development',
+        'suggestions': ['Consider adding more tension', 'Strengthen the scene ending']
+    },
+    'dialogue': {
+        'score': 0.7,
+        'feedback': 'Dialogue feels natural but could be more distinctive',
+        'suggestions': ['Give each character a unique voice', 'Add subtext to conversations']
+    },
+    'pacing': {
+        'score': 0.75,
+        'feedback': 'Pacing is generally good with room for improvement',
+        'suggestions': ['Vary sentence length for rhythm', 'Consider cutting unnecessary details']
+    }
+}
+
 def verify_project_access(project_id, user_id):
     """Verify user has access to the project"""
-    project = Project.query.filter_by(id=project_id, user_id=user_id).first()
+    project = db.session.get(Project, project_id)
+    if project is None or str(project.user_id) != str(user_id):
+        return None
     return project
 
+ai_status_response = StaticJSONResponse({
+    'ai_available': True,
+    'simulation_mode': True,  # For development
+    'version': '1.0.0',
+    'message': 'AI service is operational (simulation mode)',
+    'supported_operations': [
+        'analyze-idea',
+        'create-project-from-idea',
+        'analyze-structure',
+        'suggest-scenes',
+        'generate-story',
+        'analyze-scene'
+    ]
+})
+
 @ai_bp.route('/status', methods=['GET'])
 def ai_status():
     """Get AI service status"""
-    return jsonify({
-        'ai_available': True,
-        'simulation_mode': True,  # For development
-        'version': '1.0.0',
-        'message': 'AI service is operational (simulation mode)',
-        'supported_operations': [
-            'analyze-idea',
-            'create-project-from-idea',
-            'analyze-structure',
-            'suggest-scenes',
-            'generate-story',
-            'analyze-scene'
-        ]
-    }), 200
+    return ai_status_response()
 
 @ai_bp.route('/analyze-idea', methods=['POST'])
 @jwt_required()
@@ -56,8 +90,7 @@ def analyze_idea():
     current_user_id = get_jwt_identity()
     
     try:
-        schema = AnalyzeIdeaSchema()
-        data = schema.load(request.get_json())
+        data = analyze_idea_schema.load(request.get_json())
     except ValidationError as err:
         return jsonify({
             'error': 'Validation error',
@@ -95,8 +128,7 @@ def create_project_from_idea():
     current_user_id = get_jwt_identity()
     
     try:
-        schema = CreateProjectFromIdeaSchema()
-        data = schema.load(request.get_json())
+        data = create_project_from_idea_schema.load(request.get_json())
     except ValidationError as err:
         return jsonify({
             'error': 'Validation error',
@@ -201,11 +233,11 @@ def suggest_scenes(project_id):
             'message': 'The requested project was not found'
         }), 404
     
-    # Get existing scenes to avoid duplication
-    existing_scenes = Scene.query.filter_by(project_id=project_id).all()
+    # The simulation only numbers new scenes after the existing ones, so count them
+    existing_count = Scene.query.filter_by(project_id=project_id).count()
     
     # Generate scene suggestions
-    suggested_scenes = generate_scene_suggestions(project, existing_scenes)
+    suggested_scenes = generate_scene_suggestions(project, existing_count)
     
     return jsonify({
         'project_id': project_id,
@@ -231,12 +263,13 @@ def generate_story(project_id):
     
     # Generate story content (simulation)
     story_content = generate_story_content(project)
+    word_count = len(story_content.split())
     
     return jsonify({
         'project_id': project_id,
         'story_content': story_content,
-        'word_count': len(story_content.split()),
-        'estimated_reading_time': len(story_content.split()) // 200,  # ~200 WPM
+        'word_count': word_count,
+        'estimated_reading_time': word_count // 200,  # ~200 WPM
         'simulation_mode': True,
         'generated_at': datetime.utcnow().isoformat()
     }), 200
@@ -248,8 +281,7 @@ def analyze_scene(project_id, scene_id):
     current_user_id = get_jwt_identity()
     
     try:
-        schema = AnalyzeSceneSchema()
-        data = schema.load(request.get_json())
+        data = analyze_scene_schema.load(request.get_json())
     except ValidationError as err:
         return jsonify({
             'error': 'Validation error',
@@ -441,28 +473,18 @@ def suggest_next_phase(project):
     else:
         return 'refinement'
 
-def generate_scene_suggestions(project, existing_scenes):
+def generate_scene_suggestions(project, existing_count):
     """Generate scene suggestions (simulation)"""
-    existing_count = len(existing_scenes)
-    
-    suggestions = [
-        {
-            'title': f'Scene {existing_count + 1}: Development',
-            'description': 'Advance the plot with character interaction',
-            'scene_type': 'development',
-            'estimated_words': 600,
-            'priority': 'high'
-        },
+    return [
         {
-            'title': f'Scene {existing_count + 2}: Conflict',
-            'description': 'Introduce a new challenge or obstacle',
-            'scene_type': 'conflict',
-            'estimated_words': 750,
-            'priority': 'medium'
+            'title': f'Scene {existing_count + offset}: {label}',
+            'description': description,
+            'scene_type': scene_type,
+            'estimated_words': estimated_words,
+            'priority': priority
         }
+        for offset, label, description, scene_type, estimated_words, priority in SCENE_SUGGESTION_TEMPLATES
     ]
-    
-    return suggestions
 
 def generate_story_content(project):
     """Generate story content (simulation)"""
@@ -478,34 +500,14 @@ def generate_story_content(project):
 
 def analyze_scene_content(scene, critic_type):
     """Analyze scene content by critic type (simulation)"""
-    analysis_map = {
-        'structure': {
-            'score': 0.8,
-            'feedback': 'Scene has good structure with clear beginning and development',
-            'suggestions': ['Consider adding more tension', 'Strengthen the scene ending']
-        },
-        'dialogue': {
-            'score': 0.7,
-            'feedback': 'Dialogue feels natural but could be more distinctive',
-            'suggestions': ['Give each character a unique voice', 'Add subtext to conversations']
-        },
-        'pacing': {
-            'score': 0.75,
-            'feedback': 'Pacing is generally good with room for improvement',
-            'suggestions': ['Vary sentence length for rhythm', 'Consider cutting unnecessary details']
-        }
-    }
-    
-    result = analysis_map.get(critic_type, analysis_map['structure'])
-    result.update({
+    return {
+        **CRITIC_ANALYSIS.get(critic_type, CRITIC_ANALYSIS['structure']),
         'scene_id': scene.id,
         'critic_type': critic_type,
         'word_count': scene.word_count or 0,
         'analyzed_at': datetime.utcnow().isoformat(),
         'simulation_mode': True
-    })
-    
-    return result
+    }
 
 def generate_mock_tasks(user_id, limit):
     """Generate mock AI task history (simulation)"""
@@ -1,10 +1,10 @@
 # app/routes/analytics.py - ALVIN Analytics Routes
 from datetime import datetime, timedelta
-from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import desc, func, and_, or_
-from app import db
-from app.models import User, Project, Scene, StoryObject, TokenUsageLog, Comment
+from flask import Blueprint, Response, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
+from sqlalchemy import desc, func, and_, or_, case
+from app import db, collection_etag, response_cache
+from app.models import Project, Scene, StoryObject, TokenUsageLog, Comment, project_dicts
 
 analytics_bp = Blueprint('analytics', __name__)
 
@@ -16,13 +16,6 @@ def get_recent_activity():
         current_user_id = get_jwt_identity()
         limit = request.args.get('limit', 10, type=int)
         
-        user = User.query.get(current_user_id)
-        if not user:
-            return jsonify({
-                'error': 'User not found',
-                'message': 'The authenticated user was not found'
-            }), 404
-        
         # Get recent projects
         recent_projects = Project.query.filter_by(
             user_id=current_user_id
@@ -95,7 +88,7 @@ def get_recent_activity():
 def get_dashboard_analytics():
     """Get comprehensive dashboard analytics for the user"""
     current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = current_user
     
     if not user:
         return jsonify({
@@ -105,24 +98,57 @@ def get_dashboard_analytics():
     
     # Date ranges for analysis
     now = datetime.utcnow()
+    
+    # Everything the dashboard shows moves one of these markers; the cache TTL
+    # bounds drift in the rolling week/month windows
+    scene_updated = db.session.query(func.max(Scene.updated_at)).join(
+        Project, Scene.project_id == Project.id
+    ).filter(Project.user_id == current_user_id).scalar_subquery()
+    scene_total = db.session.query(func.count(Scene.id)).join(
+        Project, Scene.project_id == Project.id
+    ).filter(Project.user_id == current_user_id).scalar_subquery()
+    object_updated = db.session.query(func.max(StoryObject.updated_at)).join(
+        Project, StoryObject.project_id == Project.id
+    ).filter(Project.user_id == current_user_id).scalar_subquery()
+    object_total = db.session.query(func.count(StoryObject.id)).join(
+        Project, StoryObject.project_id == Project.id
+    ).filter(Project.user_id == current_user_id).scalar_subquery()
+    usage_logged = db.session.query(func.max(TokenUsageLog.created_at)).filter(
+        TokenUsageLog.user_id == current_user_id
+    ).scalar_subquery()
+    version = db.session.query(
+        func.max(Project.updated_at),
+        func.count(Project.id),
+        scene_updated,
+        scene_total,
+        object_updated,
+        object_total,
+        usage_logged
+    ).filter(Project.user_id == current_user_id).one()
+    
+    cache_key = 'dash:' + collection_etag(
+        current_user_id, *version, user.tokens_used, user.tokens_limit, user.updated_at, now.date()
+    )
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return Response(cached, mimetype='application/json')
+    
     week_ago = now - timedelta(days=7)
     month_ago = now - timedelta(days=30)
     
-    # Project statistics
-    total_projects = Project.query.filter_by(user_id=current_user_id).count()
-    active_projects = Project.query.filter_by(user_id=current_user_id, status='active').count()
-    completed_projects = Project.query.filter_by(user_id=current_user_id, status='completed').count()
+    # Project statistics and total word count in one aggregate pass
+    total_projects, active_projects, completed_projects, total_word_count = db.session.query(
+        func.count(Project.id),
+        func.coalesce(func.sum(case((Project.status == 'active', 1), else_=0)), 0),
+        func.coalesce(func.sum(case((Project.status == 'completed', 1), else_=0)), 0),
+        func.coalesce(func.sum(Project.current_word_count), 0)
+    ).filter(Project.user_id == current_user_id).one()
     
     # Recent project activity
     recent_projects = Project.query.filter_by(
         user_id=current_user_id
     ).order_by(desc(Project.updated_at)).limit(5).all()
     
-    # Word count statistics
-    total_word_count = db.session.query(
-        func.sum(Project.current_word_count)
-    ).filter_by(user_id=current_user_id).scalar() or 0
-    
     # Scene statistics
     total_scenes = db.session.query(func.count(Scene.id)).join(
         Project, Scene.project_id == Project.id
@@ -210,7 +236,7 @@ def get_dashboard_analytics():
         user_id=current_user_id
     ).group_by(Project.current_phase).all()
     
-    return jsonify({
+    response = jsonify({
         'overview': {
             'total_projects': total_projects,
             'active_projects': active_projects,
@@ -225,7 +251,7 @@ def get_dashboard_analytics():
             'tokens_this_week': tokens_this_week,
             'tokens_this_month': tokens_this_month,
             'ai_operations_this_week': ai_operations_this_week,
-            'recent_projects': [p.to_dict() for p in recent_projects]
+            'recent_projects': project_dicts(recent_projects)
         },
         'ai_usage': {
             'top_operations': [{
@@ -249,7 +275,9 @@ def get_dashboard_analytics():
                 'count': count
             } for phase, count in phase_distribution]
         }
-    }), 200
+    })
+    response_cache.set(cache_key, response.get_data())
+    return response, 200
 
 @analytics_bp.route('/projects/<project_id>', methods=['GET'])
 @jwt_required()
@@ -467,16 +495,16 @@ def get_writing_statistics():
     longest_streak = 0
     streak_count = 0
     
-    # Calculate streaks
+    # Calculate streaks (day ordinals compare without building a timedelta per day)
     for i, day in enumerate(writing_days):
-        if i == 0 or (day - writing_days[i-1]).days == 1:
+        if i == 0 or day.toordinal() - writing_days[i-1].toordinal() == 1:
             streak_count += 1
         else:
             longest_streak = max(longest_streak, streak_count)
             streak_count = 1
     
     # Check current streak
-    if writing_days and (now.date() - writing_days[-1]).days <= 1:
+    if writing_days and now.toordinal() - writing_days[-1].toordinal() <= 1:
         current_streak = streak_count
     
     longest_streak = max(longest_streak, streak_count)
@@ -622,12 +650,15 @@ def export_analytics_data():
                 'message': 'Please use ISO format: YYYY-MM-DD'
             }), 400
     
+    # One timestamp for the whole export
+    exported_at = datetime.utcnow().isoformat()
+    
     try:
         if data_type == 'projects':
             query = Project.query.filter_by(user_id=current_user_id)
             for filter_func in date_filter:
                 query = query.filter(filter_func(Project))
-            data = [project.to_dict(include_scenes=True, include_objects=True) for project in query.all()]
+            data = project_dicts(query.all())
         
         elif data_type == 'scenes':
             query = db.session.query(Scene).join(
@@ -644,27 +675,31 @@ def export_analytics_data():
             data = [log.to_dict() for log in query.all()]
         
         else:  # overview
+            # Operation count and token total from the usage log in one pass
+            ai_operations, tokens_used = db.session.query(
+                func.count(TokenUsageLog.id),
+                func.coalesce(func.sum(TokenUsageLog.total_cost), 0)
+            ).filter(TokenUsageLog.user_id == current_user_id).one()
+            
             # Compile overview statistics
             data = {
                 'user_id': current_user_id,
-                'export_date': datetime.utcnow().isoformat(),
+                'export_date': exported_at,
                 'projects': Project.query.filter_by(user_id=current_user_id).count(),
                 'scenes': db.session.query(func.count(Scene.id)).join(
                     Project, Scene.project_id == Project.id
                 ).filter(Project.user_id == current_user_id).scalar(),
-                'total_words': db.session.query(func.sum(Project.current_word_count)).filter_by(
-                    user_id=current_user_id
-                ).scalar() or 0,
-                'ai_operations': TokenUsageLog.query.filter_by(user_id=current_user_id).count(),
-                'tokens_used': TokenUsageLog.query.filter_by(user_id=current_user_id).with_entities(
-                    func.sum(TokenUsageLog.total_cost)
-                ).scalar() or 0
+                'total_words': db.session.query(
+                    func.coalesce(func.sum(Project.current_word_count), 0)
+                ).filter(Project.user_id == current_user_id).scalar(),
+                'ai_operations': ai_operations,
+                'tokens_used': tokens_used
             }
         
         return jsonify({
             'data_type': data_type,
             'format': format_type,
-            'exported_at': datetime.utcnow().isoformat(),
+            'exported_at': exported_at,
             'record_count': len(data) if isinstance(data, list) else 1,
             'data': data
         }), 200
@@ -6,8 +6,9 @@ from flask_jwt_extended import (
     get_jwt_identity, get_jwt
 )
 from marshmallow import Schema, fields, ValidationError
-from werkzeug.security import generate_password_hash, check_password_hash
-from app import db, blacklisted_tokens
+from app import db, token_blocklist, user_cache
+from app.models import revoke_user_tokens
+from app.services.passwords import hash_password, password_needs_rehash, reject_password, verify_password
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -27,12 +28,16 @@ class User:
         self.password_hash = None
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
         if not self.password_hash:
+            return reject_password(password)
+        if not verify_password(self.password_hash, password):
             return False
-        return check_password_hash(self.password_hash, password)
+        if password_needs_rehash(self.password_hash):
+            self.set_password(password)
+        return True
     
     def to_dict(self):
         return {
@@ -53,6 +58,11 @@ class User:
 
 # ✅ FIXED: In-memory user storage for development
 demo_users = {}
+demo_users_by_id = {}  # id -> user, so token lookups don't scan demo_users
+
+def find_demo_user(user_id):
+    """Look up an in-memory user by the identity stored in a JWT"""
+    return demo_users_by_id.get(int(user_id))
 
 # Create demo user
 demo_user = User(
@@ -65,6 +75,7 @@ demo_user = User(
 )
 demo_user.set_password('demo123')
 demo_users['demo@alvin.ai'] = demo_user
+demo_users_by_id[demo_user.id] = demo_user
 
 # Validation schemas
 class UserRegistrationSchema(Schema):
@@ -82,13 +93,16 @@ class UserProfileUpdateSchema(Schema):
     full_name = fields.Str(allow_none=True)
     bio = fields.Str(allow_none=True)
 
+user_registration_schema = UserRegistrationSchema()
+user_login_schema = UserLoginSchema()
+user_profile_update_schema = UserProfileUpdateSchema()
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """Register a new user"""
     try:
         # Validate input
-        schema = UserRegistrationSchema()
-        data = schema.load(request.get_json())
+        data = user_registration_schema.load(request.get_json())
     except ValidationError as err:
         return jsonify({
             'error': 'Validation error',
@@ -119,6 +133,7 @@ def register():
     
     # Store user
     demo_users[data['email']] = user
+    demo_users_by_id[user.id] = user
     
     # Create JWT tokens
     access_token = create_access_token(identity=user.id)
@@ -139,8 +154,7 @@ def login():
     """Login user and return JWT tokens"""
     try:
         # Validate input
-        schema = UserLoginSchema()
-        data = schema.load(request.get_json())
+        data = user_login_schema.load(request.get_json())
     except ValidationError as err:
         return jsonify({
             'error': 'Validation error',
@@ -151,6 +165,10 @@ def login():
     # Find user
     user = demo_users.get(data['email'])
     
+    # Unknown emails still pay for a hash check so they can't be found by timing
+    if user is None:
+        reject_password(data['password'])
+    
     if not user or not user.check_password(data['password']):
         return jsonify({
             'error': 'Invalid credentials',
@@ -184,26 +202,39 @@ def login():
 @jwt_required()
 def logout():
     """Logout user and blacklist token"""
-    jti = get_jwt()['jti']
-    blacklisted_tokens.add(jti)
+    jwt_payload = get_jwt()
+    token_blocklist.revoke(jwt_payload['jti'], jwt_payload['exp'])
     
     return jsonify({
         'success': True,
         'message': 'Successfully logged out'
     }), 200
 
+@auth_bp.route('/logout-all', methods=['POST'])
+@jwt_required()
+def logout_all():
+    """Logout user from every session by revoking all of their tokens"""
+    user_id = int(get_jwt_identity())
+    revoke_user_tokens(user_id)
+    db.session.commit()
+    # This worker sees the new version at once; other workers within USER_CACHE_TTL.
+    # The calling token goes on the shared blocklist so it is dead everywhere now.
+    user_cache.invalidate(user_id)
+    jwt_payload = get_jwt()
+    token_blocklist.revoke(jwt_payload['jti'], jwt_payload['exp'])
+    
+    return jsonify({
+        'success': True,
+        'message': 'Successfully logged out from all sessions'
+    }), 200
+
 @auth_bp.route('/refresh', methods=['POST'])
 @jwt_required(refresh=True)
 def refresh():
     """Refresh access token"""
     current_user_id = get_jwt_identity()
     
-    # Find user by ID
-    user = None
-    for u in demo_users.values():
-        if u.id == int(current_user_id):
-            user = u
-            break
+    user = find_demo_user(current_user_id)
     
     if not user or not user.is_active:
         return jsonify({
@@ -227,12 +258,7 @@ def get_current_user():
     """Get current user information"""
     current_user_id = get_jwt_identity()
     
-    # Find user by ID
-    user = None
-    for u in demo_users.values():
-        if u.id == int(current_user_id):
-            user = u
-            break
+    user = find_demo_user(current_user_id)
     
     if not user:
         return jsonify({
@@ -250,12 +276,7 @@ def update_profile():
     """Update user profile"""
     current_user_id = get_jwt_identity()
     
-    # Find user by ID
-    user = None
-    for u in demo_users.values():
-        if u.id == int(current_user_id):
-            user = u
-            break
+    user = find_demo_user(current_user_id)
     
     if not user:
         return jsonify({
@@ -265,8 +286,7 @@ def update_profile():
     
     try:
         # Validate input
-        schema = UserProfileUpdateSchema()
-        data = schema.load(request.get_json())
+        data = user_profile_update_schema.load(request.get_json())
     except ValidationError as err:
         return jsonify({
             'error': 'Validation error',
@@ -295,12 +315,7 @@ def verify_token():
     try:
         current_user_id = get_jwt_identity()
         
-        # Find user by ID
-        user = None
-        for u in demo_users.values():
-            if u.id == int(current_user_id):
-                user = u
-                break
+        user = find_demo_user(current_user_id)
         
         if not user:
             return jsonify({
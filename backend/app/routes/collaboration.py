@@ -2,11 +2,11 @@
 import uuid
 from datetime import datetime
 from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
 from marshmallow import Schema, fields, ValidationError
 from sqlalchemy import desc, or_
 from app import db
-from app.models import User, Project, ProjectCollaborator, Comment, Scene
+from app.models import User, Project, ProjectCollaborator, Comment, Scene, USER_BY_EMAIL
 
 collaboration_bp = Blueprint('collaboration', __name__)
 
@@ -30,6 +30,11 @@ class CommentUpdateSchema(Schema):
     content = fields.Str(required=True, validate=lambda x: len(x.strip()) >= 1 and len(x) <= 2000)
     is_resolved = fields.Bool(missing=None)
 
+invite_collaborator_schema = InviteCollaboratorSchema()
+update_collaborator_schema = UpdateCollaboratorSchema()
+comment_create_schema = CommentCreateSchema()
+comment_update_schema = CommentUpdateSchema()
+
 def verify_project_access(project_id, user_id, required_role=None):
     """Verify user has access to the project with optional role check"""
     # Check if user is the owner
@@ -138,8 +143,7 @@ def invite_collaborator(project_id):
     
     try:
         # Validate input
-        schema = InviteCollaboratorSchema()
-        data = schema.load(request.get_json())
+        data = invite_collaborator_schema.load(request.get_json())
     except ValidationError as err:
         return jsonify({
             'error': 'Validation error',
@@ -148,7 +152,7 @@ def invite_collaborator(project_id):
         }), 400
     
     # Find user by email
-    invited_user = User.query.filter_by(email=data['email']).first()
+    invited_user = db.session.execute(USER_BY_EMAIL, {'email': data['email']}).scalar_one_or_none()
     if not invited_user:
         return jsonify({
             'error': 'User not found',
@@ -248,8 +252,7 @@ def update_collaborator(project_id, user_id):
     
     try:
         # Validate input
-        schema = UpdateCollaboratorSchema()
-        data = schema.load(request.get_json())
+        data = update_collaborator_schema.load(request.get_json())
     except ValidationError as err:
         return jsonify({
             'error': 'Validation error',
@@ -532,8 +535,7 @@ def add_comment(project_id):
     
     try:
         # Validate input
-        schema = CommentCreateSchema()
-        data = schema.load(request.get_json())
+        data = comment_create_schema.load(request.get_json())
     except ValidationError as err:
         return jsonify({
             'error': 'Validation error',
@@ -589,7 +591,7 @@ def add_comment(project_id):
         db.session.commit()
         
         # Get user details for response
-        user = User.query.get(current_user_id)
+        user = current_user
         comment_data = comment.to_dict()
         comment_data['user'] = {
             'id': user.id,
@@ -647,8 +649,7 @@ def update_comment(project_id, comment_id):
     
     try:
         # Validate input
-        schema = CommentUpdateSchema()
-        data = schema.load(request.get_json())
+        data = comment_update_schema.load(request.get_json())
     except ValidationError as err:
         return jsonify({
             'error': 'Validation error',
@@ -47,9 +47,14 @@ class RelationshipSchema(Schema):
     description = fields.Str(missing='')
     intensity = fields.Float(missing=0.5, validate=lambda x: 0.0 <= x <= 1.0)
 
+story_object_create_schema = StoryObjectCreateSchema()
+story_object_update_schema = StoryObjectUpdateSchema()
+
 def verify_project_access(project_id, user_id):
     """Verify user has access to the project"""
-    project = Project.query.filter_by(id=project_id, user_id=user_id).first()
+    project = db.session.get(Project, project_id)
+    if project is None or str(project.user_id) != str(user_id):
+        return None
     return project
 
 @objects_bp.route('', methods=['GET'])
@@ -140,8 +145,7 @@ def create_object():
     
     try:
         # Validate input
-        schema = StoryObjectCreateSchema()
-        data = schema.load(request.get_json())
+        data = story_object_create_schema.load(request.get_json())
     except ValidationError as err:
         return jsonify({
             'error': 'Validation error',
@@ -267,8 +271,7 @@ def update_object(object_id):
     
     try:
         # Validate input
-        schema = StoryObjectUpdateSchema()
-        data = schema.load(request.get_json())
+        data = story_object_update_schema.load(request.get_json())
     except ValidationError as err:
         return jsonify({
             'error': 'Validation error',
@@ -472,9 +475,8 @@ def bulk_import_objects():
         for i, obj_data in enumerate(objects_data):
             try:
                 # Validate each object
-                schema = StoryObjectCreateSchema()
                 obj_data['project_id'] = project_id
-                validated_data = schema.load(obj_data)
+                validated_data = story_object_create_schema.load(obj_data)
                 
                 # Check for duplicates
                 existing = StoryObject.query.filter_by(
@@ -1,11 +1,11 @@
 # app/routes/projects.py - ALVIN Projects Routes
 from datetime import datetime
 from flask import Blueprint, request, jsonify, current_app, send_file
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
 from marshmallow import Schema, fields, ValidationError
 from sqlalchemy import desc, asc, or_
-from app import db
-from app.models import User, Project, Scene, StoryObject
+from app import db, collection_etag, not_modified_response
+from app.models import User, Project, Scene, StoryObject, PROJECT_LIST_COLS, project_dicts
 from app.services.export_service import ExportService
 import io
 
@@ -32,12 +32,34 @@ class ProjectUpdateSchema(Schema):
     estimated_scope = fields.Str(allow_none=True)
     marketability = fields.Int(allow_none=True, validate=lambda x: x is None or 1 <= x <= 5)
 
+project_create_schema = ProjectCreateSchema()
+project_update_schema = ProjectUpdateSchema()
+
 @projects_bp.route('', methods=['GET'])
 @jwt_required()
 def get_projects():
     """Get user's projects with filtering and pagination"""
     current_user_id = get_jwt_identity()
     
+    # The listing can only change if one of these markers does - one round trip to check
+    scene_total = db.session.query(db.func.count(Scene.id)).join(
+        Project, Scene.project_id == Project.id
+    ).filter(Project.user_id == current_user_id).scalar_subquery()
+    object_total = db.session.query(db.func.count(StoryObject.id)).join(
+        Project, StoryObject.project_id == Project.id
+    ).filter(Project.user_id == current_user_id).scalar_subquery()
+    version = db.session.query(
+        db.func.max(Project.updated_at),
+        db.func.count(Project.id),
+        scene_total,
+        object_total
+    ).filter(Project.user_id == current_user_id).one()
+    
+    etag = collection_etag(current_user_id, *version)
+    cached = not_modified_response(etag)
+    if cached is not None:
+        return cached
+    
     # Query parameters
     page = request.args.get('page', 1, type=int)
     per_page = min(request.args.get('limit', current_app.config['PROJECTS_PER_PAGE']), 100)
@@ -48,8 +70,8 @@ def get_projects():
     status = request.args.get('status', '').strip()
     phase = request.args.get('phase', '').strip()
     
-    # Base query
-    query = Project.query.filter_by(user_id=current_user_id)
+    # Base query - plain column rows, the listing never needs Project instances
+    query = db.session.query(*PROJECT_LIST_COLS).filter(Project.user_id == current_user_id)
     
     # Apply filters
     if search:
@@ -62,13 +84,13 @@ def get_projects():
         )
     
     if genre:
-        query = query.filter_by(genre=genre)
+        query = query.filter(Project.genre == genre)
     
     if status:
-        query = query.filter_by(status=status)
+        query = query.filter(Project.status == status)
     
     if phase:
-        query = query.filter_by(current_phase=phase)
+        query = query.filter(Project.current_phase == phase)
     
     # Apply sorting
     sort_column = getattr(Project, sort_by, Project.updated_at)
@@ -84,8 +106,8 @@ def get_projects():
         error_out=False
     )
     
-    return jsonify({
-        'projects': [project.to_dict() for project in pagination.items],
+    response = jsonify({
+        'projects': project_dicts(pagination.items),
         'pagination': {
             'page': page,
             'per_page': per_page,
@@ -94,14 +116,17 @@ def get_projects():
             'has_next': pagination.has_next,
             'has_prev': pagination.has_prev
         }
-    }), 200
+    })
+    response.set_etag(etag)
+    return response, 200
 
 @projects_bp.route('', methods=['POST'])
 @jwt_required()
 def create_project():
     """Create a new project"""
     current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    # Loaded once per request by the JWT user loader
+    user = current_user
     
     if not user:
         return jsonify({
@@ -111,8 +136,7 @@ def create_project():
     
     try:
         # Validate input
-        schema = ProjectCreateSchema()
-        data = schema.load(request.get_json())
+        data = project_create_schema.load(request.get_json())
     except ValidationError as err:
         return jsonify({
             'error': 'Validation error',
@@ -202,8 +226,7 @@ def update_project(project_id):
     
     try:
         # Validate input
-        schema = ProjectUpdateSchema()
-        data = schema.load(request.get_json())
+        data = project_update_schema.load(request.get_json())
     except ValidationError as err:
         return jsonify({
             'error': 'Validation error',
@@ -278,7 +301,7 @@ def delete_project(project_id):
 def duplicate_project(project_id):
     """Duplicate a project"""
     current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = current_user
     
     # Get original project
     original_project = Project.query.filter_by(id=project_id, user_id=current_user_id).first()
@@ -630,11 +653,10 @@ def create_project_object(project_id):
 def database_status():
     """Check database connection status"""
     try:
-        from app.models import User
         User.query.first()
         return jsonify({'database_connected': True}), 200
     except Exception as e:
-        print(f"Database check error: {e}")
+        current_app.logger.warning("Database check error: %s", e)
         return jsonify({'database_connected': False, 'error': str(e)}), 500
 
 @projects_bp.route('/status/redis', methods=['GET'])
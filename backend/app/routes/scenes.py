@@ -4,8 +4,8 @@ from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import Schema, fields, ValidationError
 from sqlalchemy import desc, asc
-from app import db
-from app.models import User, Project, Scene, SceneObject, StoryObject
+from app import db, collection_etag, not_modified_response
+from app.models import User, Project, Scene, SceneObject, StoryObject, SCENE_LIST_COLS, row_to_dict
 import re
 
 scenes_bp = Blueprint('scenes', __name__)
@@ -36,20 +36,36 @@ class SceneUpdateSchema(Schema):
 class SceneReorderSchema(Schema):
     scene_order = fields.List(fields.Raw(), required=True)
 
+scene_create_schema = SceneCreateSchema()
+scene_update_schema = SceneUpdateSchema()
+scene_reorder_schema = SceneReorderSchema()
+
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+WORD_RE = re.compile(r'\w+')
+
 def calculate_word_count(text):
     """Calculate word count from text content"""
     if not text:
         return 0
-    # Remove HTML tags and count words
-    clean_text = re.sub(r'<[^>]+>', '', text)
-    words = re.findall(r'\b\w+\b', clean_text)
-    return len(words)
+    # Remove HTML tags and count words without building a list of them
+    if '<' in text:
+        text = HTML_TAG_RE.sub('', text)
+    return sum(1 for _ in WORD_RE.finditer(text))
 
 def verify_project_access(project_id, user_id):
     """Verify user has access to the project"""
-    project = Project.query.filter_by(id=project_id, user_id=user_id).first()
+    project = db.session.get(Project, project_id)
+    if project is None or str(project.user_id) != str(user_id):
+        return None
     return project
 
+def get_scene_with_owner(scene_id):
+    """Load a scene and its project's owner id in one query; (None, None) if missing"""
+    row = db.session.query(Scene, Project.user_id).join(
+        Project, Scene.project_id == Project.id
+    ).filter(Scene.id == scene_id).first()
+    return row if row else (None, None)
+
 @scenes_bp.route('', methods=['GET'])
 @jwt_required()
 def get_scenes():
@@ -64,14 +80,26 @@ def get_scenes():
             'message': 'Please specify a project_id parameter'
         }), 400
     
-    # Verify project access
-    project = verify_project_access(project_id, current_user_id)
-    if not project:
+    # Any scene insert, update or delete in the project moves one of these markers;
+    # no row at all means the project is missing or not the caller's
+    version = db.session.query(
+        db.func.max(Scene.updated_at),
+        db.func.count(Scene.id)
+    ).select_from(Project).outerjoin(Scene, Scene.project_id == Project.id).filter(
+        Project.id == project_id,
+        Project.user_id == current_user_id
+    ).group_by(Project.id).first()
+    if version is None:
         return jsonify({
             'error': 'Project not found',
             'message': 'The requested project was not found'
         }), 404
     
+    etag = collection_etag(current_user_id, project_id, *version)
+    cached = not_modified_response(etag)
+    if cached is not None:
+        return cached
+    
     # Query parameters
     page = request.args.get('page', 1, type=int)
     per_page = min(request.args.get('limit', current_app.config['SCENES_PER_PAGE']), 100)
@@ -80,15 +108,15 @@ def get_scenes():
     scene_type = request.args.get('type', '').strip()
     status = request.args.get('status', '').strip()
     
-    # Base query
-    query = Scene.query.filter_by(project_id=project_id)
+    # Base query - only the serialized columns are loaded, without building Scene instances
+    query = db.session.query(*SCENE_LIST_COLS).filter(Scene.project_id == project_id)
     
     # Apply filters
     if scene_type:
-        query = query.filter_by(scene_type=scene_type)
+        query = query.filter(Scene.scene_type == scene_type)
     
     if status:
-        query = query.filter_by(status=status)
+        query = query.filter(Scene.status == status)
     
     # Apply sorting
     sort_column = getattr(Scene, sort_by, Scene.order_index)
@@ -104,8 +132,8 @@ def get_scenes():
         error_out=False
     )
     
-    return jsonify({
-        'scenes': [scene.to_dict() for scene in pagination.items],
+    response = jsonify({
+        'scenes': [row_to_dict(row) for row in pagination.items],
         'pagination': {
             'page': page,
             'per_page': per_page,
@@ -114,7 +142,9 @@ def get_scenes():
             'has_next': pagination.has_next,
             'has_prev': pagination.has_prev
         }
-    }), 200
+    })
+    response.set_etag(etag)
+    return response, 200
 
 @scenes_bp.route('', methods=['POST'])
 @jwt_required()
@@ -124,8 +154,7 @@ def create_scene():
     
     try:
         # Validate input
-        schema = SceneCreateSchema()
-        data = schema.load(request.get_json())
+        data = scene_create_schema.load(request.get_json())
     except ValidationError as err:
         return jsonify({
             'error': 'Validation error',
@@ -187,7 +216,7 @@ def get_scene(scene_id):
     """Get a specific scene"""
     current_user_id = get_jwt_identity()
     
-    scene = Scene.query.get(scene_id)
+    scene, owner_id = get_scene_with_owner(scene_id)
     if not scene:
         return jsonify({
             'error': 'Scene not found',
@@ -195,8 +224,7 @@ def get_scene(scene_id):
         }), 404
     
     # Verify project access
-    project = verify_project_access(scene.project_id, current_user_id)
-    if not project:
+    if str(owner_id) != str(current_user_id):
         return jsonify({
             'error': 'Access denied',
             'message': 'You do not have access to this scene'
@@ -215,7 +243,7 @@ def update_scene(scene_id):
     """Update a scene"""
     current_user_id = get_jwt_identity()
     
-    scene = Scene.query.get(scene_id)
+    scene, owner_id = get_scene_with_owner(scene_id)
     if not scene:
         return jsonify({
             'error': 'Scene not found',
@@ -223,8 +251,7 @@ def update_scene(scene_id):
         }), 404
     
     # Verify project access
-    project = verify_project_access(scene.project_id, current_user_id)
-    if not project:
+    if str(owner_id) != str(current_user_id):
         return jsonify({
             'error': 'Access denied',
             'message': 'You do not have access to this scene'
@@ -232,8 +259,7 @@ def update_scene(scene_id):
     
     try:
         # Validate input
-        schema = SceneUpdateSchema()
-        data = schema.load(request.get_json())
+        data = scene_update_schema.load(request.get_json())
     except ValidationError as err:
         return jsonify({
             'error': 'Validation error',
@@ -286,7 +312,7 @@ def delete_scene(scene_id):
     """Delete a scene"""
     current_user_id = get_jwt_identity()
     
-    scene = Scene.query.get(scene_id)
+    scene, owner_id = get_scene_with_owner(scene_id)
     if not scene:
         return jsonify({
             'error': 'Scene not found',
@@ -294,8 +320,7 @@ def delete_scene(scene_id):
         }), 404
     
     # Verify project access
-    project = verify_project_access(scene.project_id, current_user_id)
-    if not project:
+    if str(owner_id) != str(current_user_id):
         return jsonify({
             'error': 'Access denied',
             'message': 'You do not have access to this scene'
@@ -331,8 +356,7 @@ def reorder_scenes():
     
     try:
         # Validate input
-        schema = SceneReorderSchema()
-        data = schema.load(request.get_json())
+        data = scene_reorder_schema.load(request.get_json())
     except ValidationError as err:
         return jsonify({
             'error': 'Validation error',
@@ -393,7 +417,7 @@ def get_scene_objects(scene_id):
     """Get all objects associated with a scene"""
     current_user_id = get_jwt_identity()
     
-    scene = Scene.query.get(scene_id)
+    scene, owner_id = get_scene_with_owner(scene_id)
     if not scene:
         return jsonify({
             'error': 'Scene not found',
@@ -401,8 +425,7 @@ def get_scene_objects(scene_id):
         }), 404
     
     # Verify project access
-    project = verify_project_access(scene.project_id, current_user_id)
-    if not project:
+    if str(owner_id) != str(current_user_id):
         return jsonify({
             'error': 'Access denied',
             'message': 'You do not have access to this scene'
@@ -433,7 +456,7 @@ def add_object_to_scene(scene_id):
     """Add a story object to a scene"""
     current_user_id = get_jwt_identity()
     
-    scene = Scene.query.get(scene_id)
+    scene, owner_id = get_scene_with_owner(scene_id)
     if not scene:
         return jsonify({
             'error': 'Scene not found',
@@ -441,8 +464,7 @@ def add_object_to_scene(scene_id):
         }), 404
     
     # Verify project access
-    project = verify_project_access(scene.project_id, current_user_id)
-    if not project:
+    if str(owner_id) != str(current_user_id):
         return jsonify({
             'error': 'Access denied',
             'message': 'You do not have access to this scene'
@@ -517,7 +539,7 @@ def remove_object_from_scene(scene_id, object_id):
     """Remove a story object from a scene"""
     current_user_id = get_jwt_identity()
     
-    scene = Scene.query.get(scene_id)
+    scene, owner_id = get_scene_with_owner(scene_id)
     if not scene:
         return jsonify({
             'error': 'Scene not found',
@@ -525,8 +547,7 @@ def remove_object_from_scene(scene_id, object_id):
         }), 404
     
     # Verify project access
-    project = verify_project_access(scene.project_id, current_user_id)
-    if not project:
+    if str(owner_id) != str(current_user_id):
         return jsonify({
             'error': 'Access denied',
             'message': 'You do not have access to this scene'
@@ -245,6 +245,8 @@ class ExportService:
     
     def _export_json(self, project, scenes: List) -> BinaryIO:
         """Export story as JSON"""
+        total_word_count = sum(scene.word_count or 0 for scene in scenes)
+        
         export_data = {
             'export_metadata': {
                 'version': '1.0',
@@ -291,8 +293,8 @@ class ExportService:
             ],
             'statistics': {
                 'total_scenes': len(scenes),
-                'total_word_count': sum(scene.word_count or 0 for scene in scenes),
-                'average_scene_length': sum(scene.word_count or 0 for scene in scenes) // max(len(scenes), 1),
+                'total_word_count': total_word_count,
+                'average_scene_length': total_word_count // max(len(scenes), 1),
                 'scene_types': list(set(scene.scene_type for scene in scenes if scene.scene_type))
             }
         }
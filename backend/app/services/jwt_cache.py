@@ -0,0 +1,98 @@
+# app/services/jwt_cache.py - ALVIN JWT Decode Cache
+"""
+JWTManager that remembers verified tokens so repeat requests skip signature checks
+"""
+import hashlib
+import inspect
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from flask_jwt_extended import JWTManager
+
+logger = logging.getLogger(__name__)
+
+# The cache hooks JWTManager._decode_jwt_from_config, a private method. This is
+# its signature in flask-jwt-extended 4.5.x (the version in requirements.txt);
+# on any other signature the cache turns itself off instead of guessing.
+DECODE_HOOK_PARAMS = ('self', 'encoded_token', 'csrf_value', 'allow_expired')
+DECODE_HOOK_SUPPORTED = (
+    tuple(inspect.signature(JWTManager._decode_jwt_from_config).parameters) == DECODE_HOOK_PARAMS
+)
+
+
+class DecodedToken:
+    """Verified claims plus the time the cache entry stops being trusted"""
+
+    __slots__ = ('payload', 'cached_until')
+
+    def __init__(self, payload: dict, cached_until: float):
+        self.payload = payload
+        self.cached_until = cached_until
+
+
+class CachingJWTManager(JWTManager):
+    """JWTManager with a process-local cache of decoded tokens.
+
+    Clients send the same bearer token on every request, so the decoded claims
+    are kept for ``decode_cache_ttl`` seconds (never past the token's ``exp``)
+    keyed by a short blake2s digest of the raw token. Only the signature and
+    claim verification is skipped - blocklist and user lookups still run on
+    every request. If the installed flask-jwt-extended changes the hooked
+    method's signature, the cache is disabled and every token is fully decoded.
+    """
+
+    def __init__(self, app=None, decode_cache_maxsize: int = 10000, decode_cache_ttl: int = 30, **kwargs):
+        self.decode_cache_maxsize = decode_cache_maxsize
+        self.decode_cache_ttl = decode_cache_ttl
+        self._decode_cache = OrderedDict()  # token digest -> DecodedToken
+        self._decode_lock = threading.Lock()
+        super().__init__(app, **kwargs)
+
+    def init_app(self, app, *args, **kwargs):
+        """Register on the app, taking cache sizing from JWT_DECODE_CACHE_* config"""
+        self.decode_cache_maxsize = app.config.get('JWT_DECODE_CACHE_MAXSIZE', self.decode_cache_maxsize)
+        self.decode_cache_ttl = app.config.get('JWT_DECODE_CACHE_TTL', self.decode_cache_ttl)
+        if not DECODE_HOOK_SUPPORTED and self.decode_cache_ttl > 0:
+            logger.warning("Unsupported flask-jwt-extended decode hook signature - JWT decode cache disabled")
+            self.decode_cache_ttl = 0
+        # Claims verified under another app's secret must not carry over
+        self.clear_decode_cache()
+        super().init_app(app, *args, **kwargs)
+
+    def clear_decode_cache(self):
+        """Forget every decoded token"""
+        with self._decode_lock:
+            self._decode_cache.clear()
+
+    def _decode_jwt_from_config(self, encoded_token, *args, **kwargs):
+        # Arguments are passed through untouched so a changed upstream signature still
+        # works with the cache off. In 4.5.x they are csrf_value and allow_expired:
+        # CSRF and expired-token decodes are rare and must run the full checks
+        if self.decode_cache_ttl <= 0 or any(arg not in (None, False) for arg in (*args, *kwargs.values())):
+            return super()._decode_jwt_from_config(encoded_token, *args, **kwargs)
+
+        key = hashlib.blake2s(encoded_token.encode(), digest_size=16).digest()
+        now = time.time()
+
+        with self._decode_lock:
+            entry = self._decode_cache.get(key)
+            if entry is not None:
+                if entry.cached_until > now:
+                    self._decode_cache.move_to_end(key)
+                    return dict(entry.payload)
+                del self._decode_cache[key]
+
+        payload = super()._decode_jwt_from_config(encoded_token)
+
+        cached_until = now + self.decode_cache_ttl
+        if 'exp' in payload:
+            cached_until = min(cached_until, payload['exp'])
+
+        with self._decode_lock:
+            self._decode_cache[key] = DecodedToken(payload, cached_until)
+            while len(self._decode_cache) > self.decode_cache_maxsize:
+                self._decode_cache.popitem(last=False)
+
+        return dict(payload)
@@ -0,0 +1,102 @@
+# app/services/passwords.py - ALVIN Password Hashing
+"""
+Password hashing (argon2id, with werkzeug hashes still accepted) that keeps the slow
+key-derivation work off the event loop
+"""
+import logging
+from werkzeug.security import generate_password_hash, check_password_hash
+
+logger = logging.getLogger(__name__)
+
+# Graceful dependency imports - fall back to werkzeug hashes without argon2-cffi,
+# and run every call inline without eventlet
+ARGON2_AVAILABLE = False
+EVENTLET_AVAILABLE = False
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHash, VerificationError
+    ARGON2_AVAILABLE = True
+except ImportError:
+    logger.info("argon2-cffi not available - using werkzeug password hashes")
+
+try:
+    from eventlet import patcher, tpool
+    EVENTLET_AVAILABLE = True
+except ImportError:
+    logger.info("eventlet not available - password hashing runs inline")
+
+# argon2id tuned for interactive logins - tens of milliseconds per hash, well
+# below werkzeug's default KDF cost
+ARGON2_PREFIX = '$argon2'
+argon2_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=1) if ARGON2_AVAILABLE else None
+
+# Built on first use by reject_password(), so importing this module stays cheap
+_dummy_hash = None
+
+
+def _run_blocking(func, *args):
+    """Run a CPU-bound call in a native thread when greenlets share the OS thread
+
+    Under the threading server each request already has its own OS thread and
+    hashlib releases the GIL, so the call runs inline there.
+    """
+    if EVENTLET_AVAILABLE and patcher.is_monkey_patched('thread'):
+        return tpool.execute(func, *args)
+    return func(*args)
+
+
+def _hash(password):
+    if argon2_hasher is not None:
+        return argon2_hasher.hash(password)
+    return generate_password_hash(password)
+
+
+def _verify(password_hash, password):
+    if password_hash.startswith(ARGON2_PREFIX):
+        if argon2_hasher is None:
+            logger.error("argon2 password hash found but argon2-cffi is not installed")
+            return False
+        try:
+            return argon2_hasher.verify(password_hash, password)
+        except (VerificationError, InvalidHash):
+            return False
+
+    # Accounts created before the switch keep their werkzeug PBKDF2/scrypt hashes
+    return check_password_hash(password_hash, password)
+
+
+def hash_password(password: str) -> str:
+    """Hash a password for storage"""
+    return _run_blocking(_hash, password)
+
+
+def verify_password(password_hash: str, password: str) -> bool:
+    """Check a password against a stored hash"""
+    return _run_blocking(_verify, password_hash, password)
+
+
+def reject_password(password: str) -> bool:
+    """Spend the cost of a real verify, then fail
+
+    Used when there is no stored hash to check (unknown email, account without a
+    password) so those logins take as long as a wrong password and can't be told
+    apart by timing.
+    """
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = hash_password('alvin-dummy-password')
+    verify_password(_dummy_hash, password)
+    return False
+
+
+def password_needs_rehash(password_hash: str) -> bool:
+    """Whether a stored hash predates argon2id or the current cost parameters"""
+    if argon2_hasher is None:
+        return False
+    if not password_hash.startswith(ARGON2_PREFIX):
+        return True
+    try:
+        return argon2_hasher.check_needs_rehash(password_hash)
+    except InvalidHash:
+        return True
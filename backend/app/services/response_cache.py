@@ -0,0 +1,117 @@
+# app/services/response_cache.py - ALVIN Response Cache Service
+"""
+Short-lived cache of serialized JSON responses, shared through Redis when available
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Graceful dependency import - fall back to a process-local cache without Redis
+REDIS_AVAILABLE = False
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    logger.info("redis not available - response cache is process-local")
+
+
+class ResponseCache:
+    """Serialized response bodies keyed by a caller-supplied version stamp.
+
+    Callers put everything that can change the response into the key, so an
+    entry never needs invalidating - a write simply produces a different key and
+    the old entry ages out after ``ttl`` seconds. The TTL also bounds how stale
+    time-windowed figures (this week, this month) can get.
+
+    Without Redis, or while it is unreachable, entries live in a bounded
+    process-local LRU.
+    """
+
+    KEY_PREFIX = 'resp:'
+
+    def __init__(self, app=None, ttl: int = 60, maxsize: int = 4096):
+        self.redis = None
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._local = OrderedDict()  # key -> (body, cached_until)
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Connect to Redis (if configured) and register on the app"""
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', self.ttl)
+        self.maxsize = app.config.get('RESPONSE_CACHE_MAXSIZE', self.maxsize)
+        redis_url = app.config.get('REDIS_URL')
+
+        if redis_url and REDIS_AVAILABLE:
+            self.redis = redis.Redis.from_url(
+                redis_url,
+                socket_timeout=0.5,
+                socket_connect_timeout=0.5
+            )
+        elif redis_url:
+            logger.warning("REDIS_URL is set but redis is not installed - response cache is process-local")
+
+        self.clear()
+        app.extensions['response_cache'] = self
+
+    def clear(self):
+        """Drop the process-local entries; Redis entries expire on their own"""
+        with self._lock:
+            self._local.clear()
+
+    def _local_get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+
+            body, cached_until = entry
+            if cached_until < time.time():
+                del self._local[key]
+                return None
+
+            self._local.move_to_end(key)
+            return body
+
+    def _local_set(self, key: str, body: bytes):
+        with self._lock:
+            self._local[key] = (body, time.time() + self.ttl)
+            self._local.move_to_end(key)
+
+            while len(self._local) > self.maxsize:
+                self._local.popitem(last=False)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached body for a key, or None"""
+        if self.ttl <= 0:
+            return None
+
+        if self.redis is not None:
+            try:
+                return self.redis.get(self.KEY_PREFIX + key)
+            except redis.RedisError as e:
+                logger.warning("Response cache lookup failed: %s", e)
+
+        return self._local_get(key)
+
+    def set(self, key: str, body: bytes):
+        """Store a serialized body for ``ttl`` seconds"""
+        if self.ttl <= 0:
+            return
+
+        if self.redis is not None:
+            try:
+                self.redis.setex(self.KEY_PREFIX + key, self.ttl, body)
+                return
+            except redis.RedisError as e:
+                logger.warning("Failed to store response in cache: %s", e)
+
+        self._local_set(key, body)
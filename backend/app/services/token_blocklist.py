@@ -0,0 +1,203 @@
+# app/services/token_blocklist.py - ALVIN JWT Blocklist Service
+"""
+Shared JWT revocation store backed by Redis, with a small in-process cache in front
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Graceful dependency imports - fall back to a process-local store without Redis
+REDIS_AVAILABLE = False
+RBLOOM_AVAILABLE = False
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    logger.info("redis not available - JWT blocklist is process-local")
+
+try:
+    from rbloom import Bloom
+    RBLOOM_AVAILABLE = True
+except ImportError:
+    logger.info("rbloom not available - JWT blocklist checks skip the bloom filter")
+
+
+class TokenBlocklist:
+    """Revoked-token store shared by all workers through Redis.
+
+    Entries are written with a TTL equal to the token's remaining lifetime so
+    Redis evicts them on its own. Lookups go through a bounded L1 cache to keep
+    the per-request check in-process; if Redis is unreachable the check fails
+    open and only locally known revocations are enforced.
+
+    When rbloom is installed, a bloom filter of revoked keys answers the common
+    "not revoked" case with a single bit test. Each revocation is also indexed
+    in a sorted set (scored by expiry) and published on ``CHANNEL``; a listener
+    thread per process seeds its filter from the index once and then adds every
+    published key, so revocations from other workers reach it immediately.
+    While the listener is disconnected there is no filter and every check goes
+    to Redis.
+    """
+
+    KEY_PREFIX = 'jwt:bl:'
+    INDEX_KEY = 'jwt:bl-index'
+    CHANNEL = 'jwt:bl-revoked'
+
+    def __init__(self, app=None, l1_maxsize: int = 10000, l1_ttl: int = 30,
+                 bloom_capacity: int = 1000000, bloom_error_rate: float = 0.001):
+        self.redis = None
+        self.l1_maxsize = l1_maxsize
+        self.l1_ttl = l1_ttl
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self._l1 = OrderedDict()  # jti -> (revoked, cached_until)
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._listener = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Connect to Redis (if configured) and register on the app"""
+        redis_url = app.config.get('REDIS_URL')
+
+        if redis_url and REDIS_AVAILABLE:
+            self.redis = redis.Redis.from_url(
+                redis_url,
+                decode_responses=True,
+                socket_timeout=0.5,
+                socket_connect_timeout=0.5
+            )
+        elif redis_url:
+            logger.warning("REDIS_URL is set but redis is not installed - JWT blocklist is process-local")
+
+        if RBLOOM_AVAILABLE:
+            if self.redis is None:
+                # Every revocation happens in this process, so the filter is always complete
+                self._bloom = self._new_bloom()
+            elif self._listener is None:
+                self._listener = threading.Thread(
+                    target=self._listen, args=(redis_url,), name='jwt-blocklist-listener', daemon=True
+                )
+                self._listener.start()
+
+        app.extensions['token_blocklist'] = self
+
+    def _key(self, jti: str) -> str:
+        return self.KEY_PREFIX + hashlib.sha256(jti.encode()).hexdigest()
+
+    def _new_bloom(self):
+        return Bloom(self.bloom_capacity, self.bloom_error_rate)
+
+    def _cache_get(self, jti: str) -> Optional[bool]:
+        with self._lock:
+            entry = self._l1.get(jti)
+            if entry is None:
+                return None
+
+            revoked, cached_until = entry
+            if cached_until < time.time():
+                del self._l1[jti]
+                return None
+
+            self._l1.move_to_end(jti)
+            return revoked
+
+    def _cache_set(self, jti: str, revoked: bool, cached_until: float):
+        with self._lock:
+            self._l1[jti] = (revoked, cached_until)
+            self._l1.move_to_end(jti)
+
+            while len(self._l1) > self.l1_maxsize:
+                self._l1.popitem(last=False)
+
+    def _listen(self, redis_url: str):
+        """Keep this process's bloom filter in step with revocations published by every worker"""
+        # Own connection without a read timeout: it blocks waiting for messages
+        client = redis.Redis.from_url(redis_url, decode_responses=True, health_check_interval=30)
+        retry_delay = 1
+
+        while True:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                # Subscribe before seeding so nothing published in between is missed
+                pubsub.subscribe(self.CHANNEL)
+                bloom = self._new_bloom()
+                for key in client.zrangebyscore(self.INDEX_KEY, time.time(), '+inf'):
+                    bloom.add(key)
+
+                now = time.time()
+                with self._lock:
+                    for jti, (revoked, cached_until) in self._l1.items():
+                        if revoked and cached_until >= now:
+                            bloom.add(self._key(jti))
+
+                self._bloom = bloom
+                retry_delay = 1
+
+                for message in pubsub.listen():
+                    bloom.add(message['data'])
+            except Exception as e:
+                # Without the feed the filter would miss new revocations - check Redis instead
+                self._bloom = None
+                logger.warning("JWT blocklist listener disconnected, retrying in %ss: %s", retry_delay, e)
+            finally:
+                pubsub.close()
+
+            time.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, 30)
+
+    def revoke(self, jti: str, exp: int):
+        """Revoke a token until its expiry timestamp"""
+        now = time.time()
+        ttl = int(exp - now)
+        if ttl <= 0:
+            return
+
+        # Revocations stay cached locally for the token's whole lifetime
+        key = self._key(jti)
+        self._cache_set(jti, True, exp)
+        bloom = self._bloom
+        if bloom is not None:
+            bloom.add(key)
+
+        if self.redis is not None:
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.setex(key, ttl, 1)
+                pipe.zadd(self.INDEX_KEY, {key: exp})
+                pipe.zremrangebyscore(self.INDEX_KEY, '-inf', now)
+                pipe.publish(self.CHANNEL, key)
+                pipe.execute()
+            except redis.RedisError as e:
+                logger.error("Failed to store revoked token in Redis: %s", e)
+
+    def is_revoked(self, jti: str) -> bool:
+        """Check whether a token has been revoked"""
+        key = self._key(jti)
+        bloom = self._bloom
+        if bloom is not None and key not in bloom:
+            return False
+
+        cached = self._cache_get(jti)
+        if cached is not None:
+            return cached
+
+        if self.redis is None:
+            return False
+
+        try:
+            revoked = bool(self.redis.exists(key))
+        except redis.RedisError as e:
+            logger.warning("JWT blocklist lookup failed, allowing token: %s", e)
+            return False
+
+        self._cache_set(jti, revoked, time.time() + self.l1_ttl)
+        return revoked
@@ -0,0 +1,95 @@
+# app/services/user_cache.py - ALVIN User Lookup Cache
+"""
+Short-lived cache of token versions for the per-request JWT user lookup
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import select
+from sqlalchemy.orm import make_transient_to_detached
+
+
+class UserCache:
+    """Process-local TTL cache of each user's ``token_version``, keyed by primary key.
+
+    Every authenticated request checks its token against the user's current
+    token version, and that value only changes on logout-all. Versions are kept
+    for ``ttl`` seconds; a revoke-all on another worker therefore takes up to
+    ``ttl`` seconds to reach this one.
+
+    No other column is cached. The user handed to routes is a primary-key-only
+    instance whose columns load from the database on first access, so routes
+    never read or write on top of stale values.
+    """
+
+    def __init__(self, app=None, ttl: int = 10, maxsize: int = 10000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # user id -> (token_version, cached_until)
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Register on the app, taking sizing from USER_CACHE_* config"""
+        self.ttl = app.config.get('USER_CACHE_TTL', self.ttl)
+        self.maxsize = app.config.get('USER_CACHE_MAXSIZE', self.maxsize)
+        self.clear()
+        app.extensions['user_cache'] = self
+
+    def _get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+
+            token_version, cached_until = entry
+            if cached_until < time.time():
+                del self._entries[user_id]
+                return None
+
+            self._entries.move_to_end(user_id)
+            return token_version
+
+    def _set(self, user_id, token_version):
+        with self._lock:
+            self._entries[user_id] = (token_version, time.time() + self.ttl)
+            self._entries.move_to_end(user_id)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Forget every cached version"""
+        with self._lock:
+            self._entries.clear()
+
+    def invalidate(self, user_id):
+        """Forget a user so the next lookup reads the database"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def lookup(self, session, model, user_id):
+        """Return ``(user, token_version)`` attached to ``session``, or ``(None, None)``"""
+        # Already loaded in this session - its columns are current for this request
+        user = session.identity_map.get(session.identity_key(model, user_id))
+        if user is not None:
+            return user, user.token_version
+
+        token_version = self._get(user_id) if self.ttl > 0 else None
+        if token_version is None:
+            token_version = session.execute(
+                select(model.token_version).where(model.id == user_id)
+            ).scalar_one_or_none()
+            if token_version is None:
+                return None, None
+            if self.ttl > 0:
+                self._set(user_id, token_version)
+
+        # Only the key is set; every other column is expired and loads on first access
+        user = model(id=user_id)
+        make_transient_to_detached(user)
+        session.add(user)
+        return user, token_version
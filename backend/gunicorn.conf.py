@@ -0,0 +1,45 @@
+# backend/gunicorn.conf.py - ALVIN Gunicorn Server Hooks
+"""
+Gunicorn reads this file from the working directory on startup.
+Worker and bind settings stay on the command line (see Dockerfile).
+"""
+
+import os
+import subprocess
+import sys
+
+
+def on_starting(server):
+    """Migrate the schema and seed data once, before any worker forks
+
+    Runs `flask init-db` in a child process so the master never imports the app:
+    workers would otherwise inherit its logging thread state, locks and
+    connections.
+    """
+    if os.environ.get('RUN_DB_INIT', '1') != '1':
+        return
+
+    # The one-off job has no event loop, so keep it off the eventlet code paths
+    env = dict(os.environ, SOCKETIO_ASYNC_MODE='threading')
+    result = subprocess.run(
+        [sys.executable, '-m', 'flask', '--app', 'app:create_app', 'init-db'],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env
+    )
+    if result.returncode == 0:
+        server.log.info("Database initialized")
+    else:
+        server.log.warning("Database initialization had issues")
+
+
+def post_worker_init(worker):
+    """Start the worker's log listener and open its pooled DB connections before it accepts requests"""
+    from app import configure_logging, warm_connection_pool
+
+    configure_logging()
+
+    app = worker.wsgi
+    if hasattr(app, 'app_context'):
+        opened = warm_connection_pool(app)
+        if opened:
+            worker.log.info("Warmed %s database connections", opened)
@@ -0,0 +1,58 @@
+# migrations/env.py - Alembic Environment
+"""
+Runs migrations against the engine of the Flask app that invoked them
+(`flask db ...` or app.initialize_database())
+"""
+import logging
+
+from flask import current_app
+
+from alembic import context
+
+config = context.config
+logger = logging.getLogger('alembic.env')
+
+target_db = current_app.extensions['migrate'].db
+config.set_main_option(
+    'sqlalchemy.url',
+    target_db.engine.url.render_as_string(hide_password=False).replace('%', '%%')
+)
+
+def run_migrations_offline():
+    """Emit the migration SQL without connecting"""
+    context.configure(
+        url=config.get_main_option('sqlalchemy.url'),
+        target_metadata=target_db.metadata,
+        literal_binds=True
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    """Run migrations on a connection from the app's engine"""
+    # Skip writing an empty revision when autogenerate finds no schema changes
+    def process_revision_directives(context, revision, directives):
+        if getattr(config.cmd_opts, 'autogenerate', False):
+            script = directives[0]
+            if script.upgrade_ops.is_empty():
+                directives[:] = []
+                logger.info('No changes in schema detected.')
+
+    conf_args = current_app.extensions['migrate'].configure_args
+    conf_args.setdefault('process_revision_directives', process_revision_directives)
+
+    with target_db.engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_db.metadata,
+            **conf_args
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
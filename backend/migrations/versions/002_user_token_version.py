@@ -0,0 +1,28 @@
+# migrations/versions/002_user_token_version.py - Database Migration
+"""Add user.token_version for revoking all of a user's tokens
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Databases built by create_all() after the column was added already have it
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('user')}
+    if 'token_version' in columns:
+        return
+    op.add_column('user',
+        sa.Column('token_version', sa.Integer(), nullable=False, server_default='0')
+    )
+
+def downgrade():
+    op.drop_column('user', 'token_version')